@@ -0,0 +1,267 @@
+import argparse
+import asyncio
+import datetime
+import itertools
+import json
+import os
+import sys
+import tempfile
+import time
+from collections import defaultdict
+from typing import Optional, List, Dict, AsyncGenerator, Any
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT_DIR)
+
+LOOP_LAG_INTERVAL = 0.01
+MIN_REGRESSION_MS = 5.0
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Нагрузочный тест обработчиков бота с имитацией Telegram и GigaChat")
+    parser.add_argument("--users", type=int, default=100, help="число одновременно работающих пользователей")
+    parser.add_argument("--dialogue-turns", type=int, default=3, help="число вопросов в диалоге после ошибки")
+    parser.add_argument("--llm-latency", type=float, default=0.2, help="задержка ответа языковой модели, секунды")
+    parser.add_argument("--telegram-latency", type=float, default=0.0, help="задержка ответа Telegram API, секунды")
+    parser.add_argument("--json", dest="json_path", help="сохранить результаты в JSON-файл")
+    parser.add_argument("--baseline", help="JSON-файл с результатами предыдущего запуска для сравнения")
+    parser.add_argument("--tolerance", type=float, default=0.2,
+                        help="допустимое ухудшение относительно базового запуска, доля")
+    return parser.parse_args()
+
+
+def configure_environment():
+    data_dir = tempfile.mkdtemp(prefix="sql_ai_bot_benchmark_")
+    os.environ.setdefault("BOT_TOKEN", "42:BENCHMARK")
+    os.environ.setdefault("DB_PATH", os.path.join(data_dir, "benchmark.db"))
+    os.environ.setdefault("MIGRATIONS_DIR", os.path.join(ROOT_DIR, "sqlite", "schemas"))
+    os.environ.setdefault("OUTBOUND_GLOBAL_RATE", "100000")
+    os.environ.setdefault("OUTBOUND_CHAT_RATE", "100000")
+    os.environ.setdefault("OUTBOUND_CHAT_BURST", "100000")
+
+
+def percentile(values: List[float], fraction: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, int(round(fraction * len(ordered))) - 1))
+    return ordered[index]
+
+
+def summarize(values: List[float]) -> Dict[str, float]:
+    return {
+        "count": len(values),
+        "mean_ms": sum(values) / len(values) * 1000 if values else 0.0,
+        "p50_ms": percentile(values, 0.5) * 1000,
+        "p99_ms": percentile(values, 0.99) * 1000,
+        "max_ms": max(values) * 1000 if values else 0.0,
+    }
+
+
+class FakeChatResponse:
+    def __init__(self, content: str):
+        self.content = content
+
+
+class FakeChatModel:
+    def __init__(self, latency: float):
+        self.latency = latency
+        self.calls = 0
+
+    async def ainvoke(self, messages: List[Any]) -> FakeChatResponse:
+        self.calls += 1
+        await asyncio.sleep(self.latency)
+        return FakeChatResponse(f"Ответ модели на: {messages[-1].content[:40]}")
+
+    async def astream(self, messages: List[Any]) -> AsyncGenerator[FakeChatResponse, None]:
+        self.calls += 1
+        words = ["Ответ ", "модели ", "по ", "частям."]
+        for word in words:
+            await asyncio.sleep(self.latency / len(words))
+            yield FakeChatResponse(word)
+
+
+def create_fake_session(latency: float):
+    from aiogram.client.session.base import BaseSession
+    from aiogram.methods import SendMessage, EditMessageText
+    from aiogram.types import Message, Chat
+
+    class FakeSession(BaseSession):
+        def __init__(self):
+            super().__init__()
+            self.message_ids = itertools.count(1)
+            self.requests = 0
+
+        async def make_request(self, bot, method, timeout: Optional[int] = None):
+            self.requests += 1
+            if latency:
+                await asyncio.sleep(latency)
+            if isinstance(method, (SendMessage, EditMessageText)):
+                return Message(message_id=next(self.message_ids), date=datetime.datetime.now(),
+                               chat=Chat(id=method.chat_id, type="private"), text=method.text).as_(bot)
+            return True
+
+        async def stream_content(self, url: str, headers: Optional[Dict[str, Any]] = None, timeout: int = 30,
+                                 chunk_size: int = 65536, raise_for_status: bool = True) -> AsyncGenerator[bytes, None]:
+            yield b""
+
+        async def close(self):
+            pass
+
+    return FakeSession()
+
+
+class UpdateFactory:
+    def __init__(self):
+        self.ids = itertools.count(1)
+
+    def message(self, telegram_id: int, text: str):
+        from aiogram.types import Update, Message, Chat, User
+        return Update(update_id=next(self.ids), message=Message(
+            message_id=next(self.ids), date=datetime.datetime.now(), text=text,
+            chat=Chat(id=telegram_id, type="private"),
+            from_user=User(id=telegram_id, is_bot=False, first_name="Benchmark")))
+
+    def callback(self, telegram_id: int, data: str):
+        from aiogram.types import Update, Message, Chat, User, CallbackQuery
+        message = Message(message_id=next(self.ids), date=datetime.datetime.now(), text="Benchmark",
+                          chat=Chat(id=telegram_id, type="private"))
+        return Update(update_id=next(self.ids), callback_query=CallbackQuery(
+            id=str(next(self.ids)), chat_instance="benchmark", message=message, data=data,
+            from_user=User(id=telegram_id, is_bot=False, first_name="Benchmark")))
+
+
+def build_scenario(factory: UpdateFactory, telegram_id: int, dialogue_turns: int) -> List[tuple]:
+    scenario = [
+        ("registration", factory.message(telegram_id, "/register")),
+        ("registration", factory.message(telegram_id, "Иванов")),
+        ("registration", factory.message(telegram_id, "Иван")),
+        ("registration", factory.message(telegram_id, "Иванович")),
+        ("check_sql_correct", factory.message(telegram_id, "/check_sql SELECT 1")),
+        ("check_sql_lint", factory.message(telegram_id, f"/check_sql SELEC * FROM table_{telegram_id}")),
+        ("dialogue", factory.message(telegram_id, "/quit")),
+        ("check_sql_incorrect", factory.message(telegram_id, f"/check_sql SELECT * FROM table_{telegram_id} "
+                                                             f"WHERE id = = 1")),
+    ]
+    for turn in range(dialogue_turns):
+        scenario.append(("dialogue", factory.message(telegram_id, f"Почему запрос неверен? Вопрос {turn + 1}")))
+    scenario.append(("dialogue", factory.message(telegram_id, "/quit")))
+    scenario.append(("stats", factory.message(telegram_id, "/stats")))
+    scenario.append(("stats", factory.callback(telegram_id, "interval_10")))
+    return scenario
+
+
+async def monitor_loop_lag(lags: List[float], stop_event: asyncio.Event):
+    while not stop_event.is_set():
+        started_at = time.perf_counter()
+        await asyncio.sleep(LOOP_LAG_INTERVAL)
+        lags.append(max(0.0, time.perf_counter() - started_at - LOOP_LAG_INTERVAL))
+
+
+async def run_user(dp, bot, scenario: List[tuple], latencies: Dict[str, List[float]], errors: List[str]):
+    for kind, update in scenario:
+        started_at = time.perf_counter()
+        try:
+            await dp.feed_update(bot, update)
+        except Exception as e:
+            errors.append(f"{kind}: {e}")
+        latencies[kind].append(time.perf_counter() - started_at)
+
+
+async def run_benchmark(args: argparse.Namespace) -> Dict[str, Any]:
+    from main import register_lifecycle
+    from src.action_logging import ActionLogger
+    from src.ai_management import AIManager
+    from src.handlers import dp, bot
+    from src.outbound import OutboundDispatcher
+
+    bot.session = create_fake_session(args.telegram_latency)
+    bot.session.middleware(OutboundDispatcher())
+    fake_chat = FakeChatModel(args.llm_latency)
+    AIManager().chat = fake_chat
+    register_lifecycle()
+    await dp.emit_startup(bot=bot)
+
+    factory = UpdateFactory()
+    scenarios = [build_scenario(factory, 100000 + index, args.dialogue_turns) for index in range(args.users)]
+    latencies: Dict[str, List[float]] = defaultdict(list)
+    errors: List[str] = []
+    lags: List[float] = []
+    stop_event = asyncio.Event()
+    lag_task = asyncio.create_task(monitor_loop_lag(lags, stop_event))
+    started_at = time.perf_counter()
+    await asyncio.gather(*(run_user(dp, bot, scenario, latencies, errors) for scenario in scenarios))
+    duration = time.perf_counter() - started_at
+    stop_event.set()
+    await lag_task
+    await ActionLogger().flush()
+    await dp.emit_shutdown(bot=bot)
+
+    all_latencies = [value for values in latencies.values() for value in values]
+    return {
+        "users": args.users,
+        "updates": len(all_latencies),
+        "duration_s": duration,
+        "updates_per_second": len(all_latencies) / duration if duration else 0.0,
+        "latency": summarize(all_latencies),
+        "latency_by_kind": {kind: summarize(values) for kind, values in sorted(latencies.items())},
+        "loop_lag": summarize(lags),
+        "telegram_requests": bot.session.requests,
+        "llm_calls": fake_chat.calls,
+        "ai": AIManager().get_metrics(),
+        "outbound": OutboundDispatcher().get_metrics(),
+        "errors": errors[:20],
+        "errors_num": len(errors),
+    }
+
+
+def print_report(results: Dict[str, Any]):
+    print(f"Пользователей: {results['users']}, обновлений: {results['updates']}, "
+          f"время: {results['duration_s']:.2f} с, пропускная способность: {results['updates_per_second']:.1f} обн/с")
+    print(f"{'сценарий':<22}{'кол-во':>8}{'p50, мс':>10}{'p99, мс':>10}{'макс, мс':>10}")
+    rows = list(results["latency_by_kind"].items()) + [("всего", results["latency"]),
+                                                       ("задержка цикла", results["loop_lag"])]
+    for kind, summary in rows:
+        print(f"{kind:<22}{summary['count']:>8}{summary['p50_ms']:>10.1f}{summary['p99_ms']:>10.1f}"
+              f"{summary['max_ms']:>10.1f}")
+    print(f"Запросов к Telegram: {results['telegram_requests']}, вызовов модели: {results['llm_calls']}, "
+          f"ошибок: {results['errors_num']}")
+    for error in results["errors"]:
+        print(f"  {error}")
+
+
+def compare_with_baseline(results: Dict[str, Any], baseline: Dict[str, Any], tolerance: float) -> List[str]:
+    regressions = []
+    if results["updates_per_second"] < baseline["updates_per_second"] * (1 - tolerance):
+        regressions.append(f"пропускная способность: {results['updates_per_second']:.1f} обн/с "
+                           f"против {baseline['updates_per_second']:.1f} обн/с")
+    for kind, summary in results["latency_by_kind"].items():
+        baseline_summary = baseline["latency_by_kind"].get(kind)
+        if (baseline_summary and summary["p99_ms"] > baseline_summary["p99_ms"] * (1 + tolerance)
+                and summary["p99_ms"] - baseline_summary["p99_ms"] > MIN_REGRESSION_MS):
+            regressions.append(f"p99 '{kind}': {summary['p99_ms']:.1f} мс против {baseline_summary['p99_ms']:.1f} мс")
+    return regressions
+
+
+def main():
+    args = parse_args()
+    configure_environment()
+    results = asyncio.run(run_benchmark(args))
+    print_report(results)
+    if args.json_path:
+        with open(args.json_path, "w", encoding="utf-8") as file:
+            json.dump(results, file, ensure_ascii=False, indent=2)
+    if args.baseline:
+        with open(args.baseline, "r", encoding="utf-8") as file:
+            baseline = json.load(file)
+        regressions = compare_with_baseline(results, baseline, args.tolerance)
+        for regression in regressions:
+            print(f"Регрессия: {regression}")
+        if regressions:
+            sys.exit(1)
+    if results["errors_num"]:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,13 +1,179 @@
+import time
+
+STARTED_AT = time.perf_counter()
+
 import asyncio
+import multiprocessing
+import signal
+from typing import Set, List
+
+from aiogram import Bot
+from aiogram.webhook.aiohttp_server import SimpleRequestHandler, setup_application
+from aiohttp import web
+
+from src.action_logging import ActionLogger
+from src.actions_archive import ActionsArchiver
+from src.ai_management import AIManager
+from src.configs_management import ConfigsManager
 from src.handlers import dp, bot, set_commands, register_middlewares
+from src.db_repository import DBRepository
+from src.explanation_cache import ExplanationCache
+from src.leadership import LeaderElection
+from src.metrics import MetricsRegistry, MetricsServer
+from src.outbound import OutboundDispatcher
 from src.periodic_messages import StatsNotifier
+from src.sql_validation import SQLValidator
+from src.stats_accumulator import StatsAccumulator
+from src.user_cache import UserCache
+
+IMPORTED_AT = time.perf_counter()
+background_tasks: Set[asyncio.Task] = set()
+startup_errors: List[Exception] = []
+
+
+async def initialize_in_background(configure_commands: bool):
+    if configure_commands:
+        try:
+            await set_commands()
+        except Exception as e:
+            print(f"Ошибка установки команд бота: {e}")
+    try:
+        await DBRepository().wait_for_migrations()
+    except Exception as e:
+        print(f"Ошибка применения миграций, бот останавливается: {e}")
+        startup_errors.append(e)
+        await stop_dispatcher()
+        return
+    await ExplanationCache().prune()
+    await AIManager().warm_up()
+
+
+async def stop_dispatcher():
+    if ConfigsManager().bot_mode == "webhook":
+        signal.raise_signal(signal.SIGTERM)
+    else:
+        await dp.stop_polling()
+
+
+def exit_on_startup_errors():
+    if startup_errors:
+        raise SystemExit(1)
+
+
+async def stop_background_tasks():
+    for task in list(background_tasks):
+        task.cancel()
+    await asyncio.gather(*background_tasks, return_exceptions=True)
+
+
+async def report_startup_time():
+    print(f"Бот готов к работе за {time.perf_counter() - STARTED_AT:.2f} с "
+          f"(импорт модулей: {IMPORTED_AT - STARTED_AT:.2f} с).")
 
 
-async def main():
+async def start_stats_notifier(bot: Bot):
+    StatsNotifier(bot)
+
+
+def register_metrics():
+    metrics_registry = MetricsRegistry()
+    metrics_registry.register_gauges("bot_ai", AIManager().get_metrics)
+    metrics_registry.register_gauges("bot_action_logger", ActionLogger().get_metrics)
+    metrics_registry.register_gauges("bot_stats_accumulator", StatsAccumulator().get_metrics)
+    metrics_registry.register_gauges("bot_outbound", OutboundDispatcher().get_metrics)
+    metrics_registry.register_gauges("bot_user_cache", UserCache().get_metrics)
+    metrics_registry.register_gauges("bot_explanation_cache", ExplanationCache().get_metrics)
+    metrics_registry.register_gauges("bot_validation", lambda: SQLValidator().get_metrics())
+    metrics_server = MetricsServer()
+    dp.startup.register(metrics_server.start)
+    dp.shutdown.register(metrics_server.stop)
+
+
+def register_lifecycle(configure_commands: bool = False):
     register_middlewares()
+    register_metrics()
+    action_logger = ActionLogger()
+    leader_election = LeaderElection()
+
+    async def start_background_initialization():
+        task = asyncio.create_task(initialize_in_background(configure_commands))
+        background_tasks.add(task)
+        task.add_done_callback(background_tasks.discard)
+
+    dp.startup.register(start_background_initialization)
+    dp.shutdown.register(stop_background_tasks)
+    dp.startup.register(action_logger.start)
+    dp.shutdown.register(action_logger.stop)
+    dp.startup.register(StatsAccumulator().start)
+    dp.shutdown.register(StatsAccumulator().stop)
+    dp.shutdown.register(OutboundDispatcher().stop)
+    dp.startup.register(dp.storage.start)
+    dp.shutdown.register(dp.storage.close)
+    dp.startup.register(leader_election.start)
+    dp.shutdown.register(leader_election.stop)
+    dp.startup.register(ActionsArchiver().start)
+    dp.shutdown.register(ActionsArchiver().stop)
+    dp.startup.register(start_stats_notifier)
+    dp.startup.register(report_startup_time)
+
+
+async def run_polling():
+    register_lifecycle(configure_commands=True)
+    try:
+        await dp.start_polling(bot)
+    finally:
+        DBRepository().close()
+    exit_on_startup_errors()
+
+
+def run_webhook_worker(worker_index: int = 0):
+    configs_manager = ConfigsManager()
+    MetricsServer().worker_index = worker_index
+    register_lifecycle()
+    app = web.Application()
+    SimpleRequestHandler(dispatcher=dp, bot=bot, secret_token=configs_manager.webhook_secret).register(
+        app, path=configs_manager.webhook_path
+    )
+    setup_application(app, dp, bot=bot)
+    try:
+        web.run_app(app, host=configs_manager.webapp_host, port=configs_manager.webapp_port, reuse_port=True)
+    finally:
+        DBRepository().close()
+    exit_on_startup_errors()
+
+
+async def configure_webhook():
+    configs_manager = ConfigsManager()
     await set_commands()
-    stats_notifier = StatsNotifier(bot)
-    await dp.start_polling(bot)
+    await bot.set_webhook(f"{configs_manager.webhook_url}{configs_manager.webhook_path}",
+                          secret_token=configs_manager.webhook_secret)
+    await bot.session.close()
+
+
+def run_webhook():
+    configs_manager = ConfigsManager()
+    try:
+        asyncio.run(DBRepository().wait_for_migrations())
+    except Exception as e:
+        print(f"Ошибка применения миграций, рабочие процессы не запущены: {e}")
+        raise SystemExit(1)
+    asyncio.run(configure_webhook())
+    if configs_manager.webhook_workers == 1:
+        run_webhook_worker()
+        return
+    context = multiprocessing.get_context("spawn")
+    workers = [context.Process(target=run_webhook_worker, args=(index,), name=f"webhook-worker-{index}")
+               for index in range(configs_manager.webhook_workers)]
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+    if any(worker.exitcode for worker in workers):
+        raise SystemExit(1)
+
 
 if __name__ == "__main__":
-    asyncio.run(main())
+    if ConfigsManager().bot_mode == "webhook":
+        run_webhook()
+    else:
+        asyncio.run(run_polling())
@@ -0,0 +1,22 @@
+CREATE TABLE IF NOT EXISTS students (
+    id INTEGER PRIMARY KEY,
+    name TEXT,
+    surname TEXT,
+    group_name TEXT,
+    enrolled_at DATE
+);
+
+CREATE TABLE IF NOT EXISTS courses (
+    id INTEGER PRIMARY KEY,
+    title TEXT,
+    credits INTEGER
+);
+
+CREATE TABLE IF NOT EXISTS enrollments (
+    student_id INTEGER,
+    course_id INTEGER,
+    grade INTEGER,
+    PRIMARY KEY (student_id, course_id),
+    FOREIGN KEY (student_id) REFERENCES students (id),
+    FOREIGN KEY (course_id) REFERENCES courses (id)
+);
@@ -0,0 +1,5 @@
+CREATE TABLE IF NOT EXISTS ai_explanations (
+    cache_key TEXT PRIMARY KEY,
+    explanation TEXT,
+    created_at REAL
+);
@@ -0,0 +1 @@
+CREATE INDEX IF NOT EXISTS idx_scheduler_interval ON scheduler (interval_minutes);
@@ -0,0 +1,8 @@
+CREATE TABLE IF NOT EXISTS fsm_storage (
+    storage_key TEXT PRIMARY KEY,
+    state TEXT,
+    data BLOB,
+    updated_at REAL
+);
+
+CREATE INDEX IF NOT EXISTS idx_fsm_storage_updated_at ON fsm_storage (updated_at);
@@ -0,0 +1,5 @@
+CREATE TABLE IF NOT EXISTS leader_leases (
+    name TEXT PRIMARY KEY,
+    owner TEXT,
+    expires_at REAL
+);
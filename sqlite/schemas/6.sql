@@ -0,0 +1,39 @@
+CREATE INDEX IF NOT EXISTS idx_actions_user_timestamp ON actions (user_id, timestamp);
+
+CREATE INDEX IF NOT EXISTS idx_actions_timestamp ON actions (timestamp);
+
+CREATE TABLE IF NOT EXISTS daily_stats (
+    user_id INTEGER,
+    day TEXT,
+    messages_num INTEGER NOT NULL DEFAULT 0,
+    correct_num INTEGER NOT NULL DEFAULT 0,
+    incorrect_num INTEGER NOT NULL DEFAULT 0,
+    PRIMARY KEY (user_id, day),
+    FOREIGN KEY (user_id) REFERENCES users (telegram_id)
+) WITHOUT ROWID;
+
+CREATE INDEX IF NOT EXISTS idx_daily_stats_day ON daily_stats (day);
+
+INSERT OR IGNORE INTO daily_stats (user_id, day, messages_num)
+SELECT user_id, date(timestamp), COUNT(*) FROM actions
+WHERE user_id IS NOT NULL
+GROUP BY user_id, date(timestamp);
+
+CREATE TRIGGER IF NOT EXISTS trg_actions_daily_stats
+AFTER INSERT ON actions
+WHEN NEW.user_id IS NOT NULL
+BEGIN
+    INSERT INTO daily_stats (user_id, day, messages_num)
+    VALUES (NEW.user_id, date(NEW.timestamp), 1)
+    ON CONFLICT(user_id, day) DO UPDATE SET messages_num = messages_num + 1;
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_stats_daily_stats
+AFTER UPDATE OF correct_num, incorrect_num ON stats
+WHEN NEW.correct_num != OLD.correct_num OR NEW.incorrect_num != OLD.incorrect_num
+BEGIN
+    INSERT INTO daily_stats (user_id, day, correct_num, incorrect_num)
+    VALUES (NEW.user_id, date('now'), NEW.correct_num - OLD.correct_num, NEW.incorrect_num - OLD.incorrect_num)
+    ON CONFLICT(user_id, day) DO UPDATE SET correct_num = correct_num + excluded.correct_num,
+                                            incorrect_num = incorrect_num + excluded.incorrect_num;
+END;
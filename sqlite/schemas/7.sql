@@ -0,0 +1,18 @@
+ALTER TABLE actions ADD COLUMN kind TEXT NOT NULL DEFAULT 'message';
+
+ALTER TABLE actions ADD COLUMN error_kind TEXT;
+
+ALTER TABLE actions ADD COLUMN error TEXT;
+
+CREATE INDEX IF NOT EXISTS idx_actions_user_kind_timestamp ON actions (user_id, kind, timestamp);
+
+DROP TRIGGER IF EXISTS trg_actions_daily_stats;
+
+CREATE TRIGGER IF NOT EXISTS trg_actions_daily_stats
+AFTER INSERT ON actions
+WHEN NEW.user_id IS NOT NULL AND NEW.kind = 'message'
+BEGIN
+    INSERT INTO daily_stats (user_id, day, messages_num)
+    VALUES (NEW.user_id, date(NEW.timestamp), 1)
+    ON CONFLICT(user_id, day) DO UPDATE SET messages_num = messages_num + 1;
+END;
@@ -0,0 +1,89 @@
+import asyncio
+import sqlite3
+from collections import deque
+from datetime import datetime, timezone
+from typing import Optional, Deque, Dict, Tuple
+
+from src.configs_management import ConfigsManager
+from src.db_repository import DBRepository
+
+ACTION_MESSAGE = "message"
+ACTION_SQL_CORRECT = "sql_correct"
+ACTION_SQL_ERROR = "sql_error"
+
+
+class ActionLogger:
+    _instance = None
+
+    def __new__(cls):
+        if cls._instance is None:
+            cls._instance = super().__new__(cls)
+            cls._instance.__init__()
+            cls._instance._initialize_buffer()
+        return cls._instance
+
+    def __init__(self):
+        configs_manager = ConfigsManager()
+        self.batch_size = configs_manager.action_log_batch_size
+        self.flush_interval = configs_manager.action_log_flush_interval
+        self.buffer_size = configs_manager.action_log_buffer_size
+        self.repository = DBRepository()
+
+    def _initialize_buffer(self):
+        self._buffer: Deque[Tuple[str, str, int, str, Optional[str], Optional[str]]] = deque()
+        self._flush_event = asyncio.Event()
+        self._flush_task: Optional[asyncio.Task] = None
+        self._stopping = False
+        self.flushed_actions = 0
+        self.dropped_actions = 0
+
+    def get_metrics(self) -> Dict[str, int]:
+        return {
+            "buffered": len(self._buffer),
+            "flushed": self.flushed_actions,
+            "dropped": self.dropped_actions,
+        }
+
+    def log(self, telegram_id: int, message: str, kind: str = ACTION_MESSAGE, error_kind: Optional[str] = None,
+            error: Optional[str] = None):
+        if len(self._buffer) >= self.buffer_size:
+            self.dropped_actions += 1
+            if self.dropped_actions % self.batch_size == 1:
+                print(f"Буфер журнала действий переполнен, отброшено записей: {self.dropped_actions}")
+            return
+        timestamp = datetime.now(timezone.utc).strftime("%Y-%m-%d %H:%M:%S")
+        self._buffer.append((message, timestamp, kind, error_kind, error, telegram_id))
+        if len(self._buffer) >= self.batch_size:
+            self._flush_event.set()
+
+    async def flush(self):
+        while self._buffer:
+            batch = [self._buffer.popleft() for _ in range(min(self.batch_size, len(self._buffer)))]
+            try:
+                await asyncio.shield(self.repository.log_actions(batch))
+                self.flushed_actions += len(batch)
+            except sqlite3.Error as e:
+                self.dropped_actions += len(batch)
+                print(f"Ошибка записи журнала действий: {e}")
+
+    async def _flush_loop(self):
+        while not self._stopping:
+            try:
+                await asyncio.wait_for(self._flush_event.wait(), timeout=self.flush_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._flush_event.clear()
+            await self.flush()
+
+    async def start(self):
+        if self._flush_task is None:
+            self._stopping = False
+            self._flush_task = asyncio.create_task(self._flush_loop())
+
+    async def stop(self):
+        if self._flush_task is not None:
+            self._stopping = True
+            self._flush_event.set()
+            await self._flush_task
+            self._flush_task = None
+        await self.flush()
@@ -0,0 +1,89 @@
+import asyncio
+import gzip
+import json
+import os
+from datetime import datetime, timedelta, timezone
+from typing import Optional, List
+
+from src.configs_management import ConfigsManager
+from src.db_repository import DBRepository
+from src.leadership import LeaderElection
+
+
+class ActionsArchiver:
+    _instance = None
+
+    def __new__(cls):
+        if cls._instance is None:
+            cls._instance = super().__new__(cls)
+            cls._instance.__init__()
+            cls._instance._initialize_task()
+        return cls._instance
+
+    def __init__(self):
+        configs_manager = ConfigsManager()
+        self.archive_dir = configs_manager.actions_archive_dir
+        self.retention_days = configs_manager.actions_retention_days
+        self.archive_interval = configs_manager.actions_archive_interval
+        self.batch_size = configs_manager.actions_archive_batch_size
+        self.repository = DBRepository()
+
+    def _initialize_task(self):
+        self._archive_task: Optional[asyncio.Task] = None
+        self.archived_actions = 0
+
+    def _write_archive(self, rows: List[tuple]) -> str:
+        os.makedirs(self.archive_dir, exist_ok=True)
+        filename = f"actions_{rows[0][0]}-{rows[-1][0]}.jsonl.gz"
+        archive_path = os.path.join(self.archive_dir, filename)
+        temp_path = archive_path + ".tmp"
+        with open(temp_path, "wb") as raw_file:
+            with gzip.GzipFile(fileobj=raw_file, mode="wb") as file:
+                for action_id, user_id, timestamp, message, kind, error_kind, error in rows:
+                    record = {"id": action_id, "user_id": user_id, "timestamp": timestamp, "message": message,
+                              "kind": kind, "error_kind": error_kind, "error": error}
+                    file.write((json.dumps(record, ensure_ascii=False) + "\n").encode("utf-8"))
+            raw_file.flush()
+            os.fsync(raw_file.fileno())
+        os.replace(temp_path, archive_path)
+        return archive_path
+
+    async def archive(self) -> int:
+        cutoff = datetime.now(timezone.utc) - timedelta(days=self.retention_days)
+        cutoff = cutoff.strftime("%Y-%m-%d %H:%M:%S")
+        archived = 0
+        while True:
+            rows = await self.repository.get_actions_before(cutoff, self.batch_size)
+            if not rows:
+                break
+            await asyncio.to_thread(self._write_archive, rows)
+            archived += await self.repository.delete_actions_before(cutoff, rows[-1][0])
+            if len(rows) < self.batch_size:
+                break
+        self.archived_actions += archived
+        return archived
+
+    async def _archive_loop(self):
+        while True:
+            await asyncio.sleep(self.archive_interval)
+            if not LeaderElection().is_leader:
+                continue
+            try:
+                archived = await self.archive()
+                if archived:
+                    print(f"Перенесено в архив записей журнала действий: {archived}")
+            except Exception as e:
+                print(f"Ошибка архивации журнала действий: {e}")
+
+    async def start(self):
+        if self.archive_dir and self._archive_task is None:
+            self._archive_task = asyncio.create_task(self._archive_loop())
+
+    async def stop(self):
+        if self._archive_task is not None:
+            self._archive_task.cancel()
+            try:
+                await self._archive_task
+            except asyncio.CancelledError:
+                pass
+            self._archive_task = None
@@ -1,9 +1,54 @@
-from typing import Optional, List, Dict
-
-from langchain.schema import SystemMessage, HumanMessage, AIMessage
-from langchain_gigachat import GigaChat
+import asyncio
+import threading
+import time
+from typing import Optional, List, Dict, AsyncIterator, Callable, TYPE_CHECKING
 
 from src.configs_management import ConfigsManager
+from src.explanation_cache import ExplanationCache
+from src.metrics import LLM_LATENCY
+from src.sql_utils import make_query_key
+
+if TYPE_CHECKING:
+    from langchain_gigachat import GigaChat
+
+
+class SharedAnalysis:
+    def __init__(self):
+        self.chunks: List[str] = []
+        self.error: Optional[BaseException] = None
+        self.done = False
+        self.task: Optional[asyncio.Task] = None
+        self._updated = asyncio.Condition()
+
+    async def produce(self, chunks: AsyncIterator[str]):
+        try:
+            async for chunk in chunks:
+                async with self._updated:
+                    self.chunks.append(chunk)
+                    self._updated.notify_all()
+        except BaseException as e:
+            self.error = e
+            if not isinstance(e, Exception):
+                raise
+        finally:
+            async with self._updated:
+                self.done = True
+                self._updated.notify_all()
+
+    async def follow(self) -> AsyncIterator[str]:
+        index = 0
+        while True:
+            async with self._updated:
+                await self._updated.wait_for(lambda: index < len(self.chunks) or self.done)
+                chunks = self.chunks[index:]
+                done = self.done
+            for chunk in chunks:
+                yield chunk
+            index += len(chunks)
+            if done and index == len(self.chunks):
+                if self.error is not None:
+                    raise self.error
+                return
 
 
 class AIManager:
@@ -13,26 +58,75 @@ class AIManager:
         if cls._instance is None:
             cls._instance = super().__new__(cls)
             cls._instance.__init__()
+            cls._instance._initialize_pool()
         return cls._instance
 
     def __init__(self):
-        self.chat: Optional[GigaChat] = None
-        self._initialize_chat()
+        self.api_key = ConfigsManager().gigachat_api_key
 
-    def _initialize_chat(self):
+    def _initialize_pool(self):
         configs_manager = ConfigsManager()
-        api_key = configs_manager.gigachat_api_key
+        self._chat: Optional["GigaChat"] = None
+        self._chat_loaded = False
+        self._chat_lock = threading.Lock()
+        self._chat_loading: Optional[asyncio.Task] = None
+        self.request_timeout = configs_manager.ai_request_timeout
+        self._semaphore = asyncio.Semaphore(configs_manager.ai_max_concurrency)
+        self.queue_depth = 0
+        self.in_flight = 0
+        self.completed_requests = 0
+        self.timed_out_requests = 0
+        self.explanation_cache = ExplanationCache()
+        self._analyses_in_flight: Dict[str, SharedAnalysis] = {}
+        self.coalesced_requests = 0
+
+    @property
+    def chat(self) -> Optional["GigaChat"]:
+        return self._chat
+
+    @chat.setter
+    def chat(self, chat: Optional["GigaChat"]):
+        self._chat = chat
+        self._chat_loaded = True
+
+    def _initialize_chat(self):
+        with self._chat_lock:
+            if self._chat_loaded:
+                return
+            try:
+                from langchain_gigachat import GigaChat
+                self._chat = GigaChat(
+                    credentials=self.api_key,
+                    verify_ssl_certs=False
+                )
+            except Exception as e:
+                print(f"Error initializing GigaChat: {e}")
+                self._chat = None
+            self._chat_loaded = True
+
+    async def _load_chat(self):
+        await asyncio.to_thread(self._initialize_chat)
         try:
-            self.chat = GigaChat(
-                credentials=api_key,
-                verify_ssl_certs=False
-            )
+            await asyncio.to_thread(self._convert_messages_to_langchain, [])
         except Exception as e:
             print(f"Error initializing GigaChat: {e}")
-            self.chat = None
+            self._chat = None
+
+    async def get_chat(self) -> Optional["GigaChat"]:
+        if self._chat_loading is None:
+            self._chat_loading = asyncio.create_task(self._load_chat())
+        if not self._chat_loading.done():
+            await asyncio.shield(self._chat_loading)
+        return self._chat
+
+    async def warm_up(self):
+        started_at = time.perf_counter()
+        await self.get_chat()
+        print(f"Клиент GigaChat загружен за {time.perf_counter() - started_at:.2f} с.")
 
     @staticmethod
     def _convert_messages_to_langchain(messages: List[Dict[str, str]]) -> List:
+        from langchain.schema import SystemMessage, HumanMessage, AIMessage
         converted_messages = []
         for message in messages:
             if message["role"] == "system":
@@ -43,10 +137,80 @@ class AIManager:
                 converted_messages.append(AIMessage(content=message["content"]))
         return converted_messages
 
-    async def get_sql_error_help(self, query: str, error_message: str) -> str:
-        if not self.chat:
-            return "Извините, сервис анализа ошибок временно недоступен."
-        messages = [
+    def get_metrics(self) -> Dict[str, int]:
+        return {
+            "queue_depth": self.queue_depth,
+            "in_flight": self.in_flight,
+            "completed": self.completed_requests,
+            "timed_out": self.timed_out_requests,
+            "analyses_in_flight": len(self._analyses_in_flight),
+            "coalesced": self.coalesced_requests,
+        }
+
+    async def _acquire(self):
+        self.queue_depth += 1
+        try:
+            await self._semaphore.acquire()
+        finally:
+            self.queue_depth -= 1
+        self.in_flight += 1
+
+    def _release(self):
+        self.in_flight -= 1
+        self._semaphore.release()
+
+    async def _invoke(self, messages: List[Dict[str, str]]) -> str:
+        langchain_messages = self._convert_messages_to_langchain(messages)
+        await self._acquire()
+        started_at = time.perf_counter()
+        outcome = "error"
+        try:
+            response = await asyncio.wait_for(self._chat.ainvoke(langchain_messages), timeout=self.request_timeout)
+            outcome = "ok"
+        except asyncio.TimeoutError:
+            self.timed_out_requests += 1
+            outcome = "timeout"
+            raise
+        finally:
+            self._release()
+            LLM_LATENCY.observe(time.perf_counter() - started_at, "invoke", outcome)
+        self.completed_requests += 1
+        return response.content
+
+    async def _stream(self, messages: List[Dict[str, str]]) -> AsyncIterator[str]:
+        langchain_messages = self._convert_messages_to_langchain(messages)
+        await self._acquire()
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + self.request_timeout
+        started_at = time.perf_counter()
+        outcome = "error"
+        stream = self._chat.astream(langchain_messages)
+        try:
+            while True:
+                try:
+                    chunk = await asyncio.wait_for(stream.__anext__(), timeout=max(deadline - loop.time(), 0))
+                except StopAsyncIteration:
+                    outcome = "ok"
+                    break
+                except asyncio.TimeoutError:
+                    self.timed_out_requests += 1
+                    outcome = "timeout"
+                    raise
+                if chunk.content:
+                    yield chunk.content
+        finally:
+            await stream.aclose()
+            self._release()
+            LLM_LATENCY.observe(time.perf_counter() - started_at, "stream", outcome)
+        self.completed_requests += 1
+
+    @staticmethod
+    def _stream_error_prefix(chunks: List[str]) -> str:
+        return "\n\n" if chunks else ""
+
+    @staticmethod
+    def _build_error_help_messages(query: str, error_message: str) -> List[Dict[str, str]]:
+        return [
             {
                 "role": "system",
                 "content": """Вы - эксперт SQL, который помогает исправлять ошибки в запросах. 
@@ -60,19 +224,118 @@ class AIManager:
                 """
             }
         ]
+
+    async def _produce_analysis(self, key: str, analysis: SharedAnalysis, chunks: AsyncIterator[str]):
+        try:
+            await analysis.produce(chunks)
+        finally:
+            self._analyses_in_flight.pop(key, None)
+
+    def _coalesce_analysis(self, query: str, error_message: str,
+                           producer: Callable[[str, str], AsyncIterator[str]]) -> AsyncIterator[str]:
+        key = make_query_key(query, error_message)
+        analysis = self._analyses_in_flight.get(key)
+        if analysis is None:
+            analysis = SharedAnalysis()
+            self._analyses_in_flight[key] = analysis
+            analysis.task = asyncio.create_task(self._produce_analysis(key, analysis, producer(query, error_message)))
+        else:
+            self.coalesced_requests += 1
+        return analysis.follow()
+
+    async def _sql_error_help_chunks(self, query: str, error_message: str) -> AsyncIterator[str]:
+        yield await self._get_sql_error_help(query, error_message)
+
+    async def get_sql_error_help(self, query: str, error_message: str) -> str:
+        chunks = self._coalesce_analysis(query, error_message, self._sql_error_help_chunks)
+        return "".join([chunk async for chunk in chunks])
+
+    async def stream_sql_error_help(self, query: str, error_message: str) -> AsyncIterator[str]:
+        async for chunk in self._coalesce_analysis(query, error_message, self._stream_sql_error_help):
+            yield chunk
+
+    async def _get_sql_error_help(self, query: str, error_message: str) -> str:
+        cached_help = await self.explanation_cache.get(query, error_message)
+        if cached_help is not None:
+            return cached_help
+        if not await self.get_chat():
+            return "Извините, сервис анализа ошибок временно недоступен."
+        messages = self._build_error_help_messages(query, error_message)
         try:
-            langchain_messages = self._convert_messages_to_langchain(messages)
-            response = self.chat.invoke(langchain_messages)
-            return response.content
+            help_message = await self._invoke(messages)
+        except asyncio.TimeoutError:
+            return "Превышено время ожидания ответа от сервиса анализа ошибок."
         except Exception as e:
             return f"Произошла ошибка при анализе запроса: {e}"
+        await self.explanation_cache.put(query, error_message, help_message)
+        return help_message
+
+    async def _stream_sql_error_help(self, query: str, error_message: str) -> AsyncIterator[str]:
+        cached_help = await self.explanation_cache.get(query, error_message)
+        if cached_help is not None:
+            yield cached_help
+            return
+        if not await self.get_chat():
+            yield "Извините, сервис анализа ошибок временно недоступен."
+            return
+        messages = self._build_error_help_messages(query, error_message)
+        chunks = []
+        try:
+            async for chunk in self._stream(messages):
+                chunks.append(chunk)
+                yield chunk
+        except asyncio.TimeoutError:
+            yield self._stream_error_prefix(chunks) + "Превышено время ожидания ответа от сервиса анализа ошибок."
+            return
+        except Exception as e:
+            yield self._stream_error_prefix(chunks) + f"Произошла ошибка при анализе запроса: {e}"
+            return
+        await self.explanation_cache.put(query, error_message, "".join(chunks))
 
     async def continue_dialogue(self, message_history: List[Dict[str, str]]) -> str:
-        if not self.chat:
+        if not await self.get_chat():
             return "Извините, сервис временно недоступен."
         try:
-            langchain_messages = self._convert_messages_to_langchain(message_history)
-            response = self.chat.invoke(langchain_messages)
-            return response.content
+            return await self._invoke(message_history)
+        except asyncio.TimeoutError:
+            return "Превышено время ожидания ответа от сервиса."
         except Exception as e:
             return f"Произошла ошибка при обработке вашего вопроса: {e}"
+
+    async def stream_dialogue(self, message_history: List[Dict[str, str]]) -> AsyncIterator[str]:
+        if not await self.get_chat():
+            yield "Извините, сервис временно недоступен."
+            return
+        chunks = []
+        try:
+            async for chunk in self._stream(message_history):
+                chunks.append(chunk)
+                yield chunk
+        except asyncio.TimeoutError:
+            yield self._stream_error_prefix(chunks) + "Превышено время ожидания ответа от сервиса."
+        except Exception as e:
+            yield self._stream_error_prefix(chunks) + f"Произошла ошибка при обработке вашего вопроса: {e}"
+
+    async def summarize_dialogue(self, previous_summary: Optional[str],
+                                 messages: List[Dict[str, str]]) -> Optional[str]:
+        if not await self.get_chat():
+            return None
+        dialogue = "\n".join(f"{message['role']}: {message['content']}" for message in messages)
+        if previous_summary:
+            dialogue = f"Предыдущее краткое содержание: {previous_summary}\n{dialogue}"
+        summary_messages = [
+            {
+                "role": "system",
+                "content": "Кратко перескажите диалог о SQL-запросе, сохранив важные для продолжения факты, "
+                           "вопросы пользователя и предложенные исправления."
+            },
+            {
+                "role": "user",
+                "content": dialogue
+            }
+        ]
+        try:
+            return await self._invoke(summary_messages)
+        except Exception as e:
+            print(f"Ошибка сокращения истории диалога: {e}")
+            return None
@@ -15,14 +15,105 @@ class ConfigsManager:
 
     def __init__(self):
         self.bot_token: Optional[str] = None
+        self.bot_mode: str = "polling"
+        self.webhook_url: Optional[str] = None
+        self.webhook_path: str = "/webhook"
+        self.webhook_secret: Optional[str] = None
+        self.webapp_host: str = "0.0.0.0"
+        self.webapp_port: int = 8080
+        self.webhook_workers: int = 1
+        self.leader_lease_ttl: float = 30.0
+        self.metrics_host: str = "127.0.0.1"
+        self.metrics_port: Optional[int] = None
         self.db_path: Optional[str] = None
         self.migrations_dir: Optional[str] = None
+        self.db_read_pool_size: int = 4
+        self.action_log_batch_size: int = 100
+        self.action_log_flush_interval: float = 1.0
+        self.action_log_buffer_size: int = 10000
+        self.actions_archive_dir: Optional[str] = None
+        self.actions_retention_days: int = 90
+        self.actions_archive_interval: float = 24 * 60 * 60
+        self.actions_archive_batch_size: int = 5000
+        self.user_cache_size: int = 10000
+        self.user_cache_negative_ttl: float = 30.0
+        self.explanation_cache_size: int = 1000
+        self.explanation_cache_ttl: float = 7 * 24 * 60 * 60
+        self.practice_schemas_dir: Optional[str] = None
+        self.validation_pool_size: int = 4
+        self.validation_cache_size: int = 1000
+        self.validation_instruction_limit: int = 10_000_000
+        self.max_batch_statements: int = 100
+        self.max_sql_file_size: int = 256 * 1024
+        self.stats_dispatch_spread: float = 30.0
+        self.stats_flush_interval: float = 5.0
+        self.stats_jobs_sync_interval: float = 10.0
+        self.outbound_global_rate: float = 30.0
+        self.outbound_chat_rate: float = 1.0
+        self.outbound_chat_burst: float = 3.0
+        self.outbound_max_retries: int = 3
+        self.fsm_state_ttl: float = 24 * 60 * 60
+        self.fsm_vacuum_interval: float = 60 * 60
         self.gigachat_api_key: Optional[str] = None
+        self.ai_max_concurrency: int = 4
+        self.ai_request_timeout: float = 60.0
+        self.ai_streaming: bool = True
+        self.stream_edit_interval: float = 1.0
+        self.dialogue_token_budget: int = 3000
+        self.dialogue_recent_turns: int = 4
         self._load_configs()
 
     def _load_configs(self):
         dotenv.load_dotenv()
         self.bot_token = os.getenv("BOT_TOKEN")
+        self.bot_mode = os.getenv("BOT_MODE", self.bot_mode)
+        self.webhook_url = os.getenv("WEBHOOK_URL")
+        self.webhook_path = os.getenv("WEBHOOK_PATH", self.webhook_path)
+        self.webhook_secret = os.getenv("WEBHOOK_SECRET")
+        self.webapp_host = os.getenv("WEBAPP_HOST", self.webapp_host)
+        self.webapp_port = int(os.getenv("WEBAPP_PORT", self.webapp_port))
+        self.webhook_workers = int(os.getenv("WEBHOOK_WORKERS", self.webhook_workers))
+        self.leader_lease_ttl = float(os.getenv("LEADER_LEASE_TTL", self.leader_lease_ttl))
+        self.metrics_host = os.getenv("METRICS_HOST", self.metrics_host)
+        self.metrics_port = int(os.getenv("METRICS_PORT")) if os.getenv("METRICS_PORT") else None
         self.db_path = os.getenv("DB_PATH")
         self.migrations_dir = os.getenv("MIGRATIONS_DIR")
+        self.db_read_pool_size = int(os.getenv("DB_READ_POOL_SIZE", self.db_read_pool_size))
+        self.action_log_batch_size = int(os.getenv("ACTION_LOG_BATCH_SIZE", self.action_log_batch_size))
+        self.action_log_flush_interval = float(os.getenv("ACTION_LOG_FLUSH_INTERVAL",
+                                                         self.action_log_flush_interval))
+        self.action_log_buffer_size = int(os.getenv("ACTION_LOG_BUFFER_SIZE", self.action_log_buffer_size))
+        self.actions_archive_dir = os.getenv("ACTIONS_ARCHIVE_DIR")
+        self.actions_retention_days = int(os.getenv("ACTIONS_RETENTION_DAYS", self.actions_retention_days))
+        self.actions_archive_interval = float(os.getenv("ACTIONS_ARCHIVE_INTERVAL", self.actions_archive_interval))
+        self.actions_archive_batch_size = int(os.getenv("ACTIONS_ARCHIVE_BATCH_SIZE",
+                                                        self.actions_archive_batch_size))
+        self.user_cache_size = int(os.getenv("USER_CACHE_SIZE", self.user_cache_size))
+        self.user_cache_negative_ttl = float(os.getenv("USER_CACHE_NEGATIVE_TTL", self.user_cache_negative_ttl))
+        if self.webhook_workers > 1 and os.getenv("USER_CACHE_NEGATIVE_TTL") is None:
+            self.user_cache_negative_ttl = 0
+        self.explanation_cache_size = int(os.getenv("EXPLANATION_CACHE_SIZE", self.explanation_cache_size))
+        self.explanation_cache_ttl = float(os.getenv("EXPLANATION_CACHE_TTL", self.explanation_cache_ttl))
+        self.practice_schemas_dir = os.getenv("PRACTICE_SCHEMAS_DIR")
+        self.validation_pool_size = int(os.getenv("VALIDATION_POOL_SIZE", self.validation_pool_size))
+        self.validation_cache_size = int(os.getenv("VALIDATION_CACHE_SIZE", self.validation_cache_size))
+        self.validation_instruction_limit = int(os.getenv("VALIDATION_INSTRUCTION_LIMIT",
+                                                          self.validation_instruction_limit))
+        self.max_batch_statements = int(os.getenv("MAX_BATCH_STATEMENTS", self.max_batch_statements))
+        self.max_sql_file_size = int(os.getenv("MAX_SQL_FILE_SIZE", self.max_sql_file_size))
+        self.stats_dispatch_spread = float(os.getenv("STATS_DISPATCH_SPREAD", self.stats_dispatch_spread))
+        self.stats_flush_interval = float(os.getenv("STATS_FLUSH_INTERVAL", self.stats_flush_interval))
+        self.stats_jobs_sync_interval = float(os.getenv("STATS_JOBS_SYNC_INTERVAL", self.stats_jobs_sync_interval))
+        self.outbound_global_rate = float(os.getenv("OUTBOUND_GLOBAL_RATE", self.outbound_global_rate))
+        self.outbound_chat_rate = float(os.getenv("OUTBOUND_CHAT_RATE", self.outbound_chat_rate))
+        self.outbound_chat_burst = float(os.getenv("OUTBOUND_CHAT_BURST", self.outbound_chat_burst))
+        self.outbound_max_retries = int(os.getenv("OUTBOUND_MAX_RETRIES", self.outbound_max_retries))
+        self.fsm_state_ttl = float(os.getenv("FSM_STATE_TTL", self.fsm_state_ttl))
+        self.fsm_vacuum_interval = float(os.getenv("FSM_VACUUM_INTERVAL", self.fsm_vacuum_interval))
         self.gigachat_api_key = os.getenv("GIGACHAT_API_KEY")
+        self.ai_max_concurrency = int(os.getenv("AI_MAX_CONCURRENCY", self.ai_max_concurrency))
+        self.ai_request_timeout = float(os.getenv("AI_REQUEST_TIMEOUT", self.ai_request_timeout))
+        self.ai_streaming = os.getenv("AI_STREAMING", str(self.ai_streaming)).lower() in ("1", "true", "yes")
+        self.stream_edit_interval = float(os.getenv("STREAM_EDIT_INTERVAL", self.stream_edit_interval))
+        self.dialogue_token_budget = int(os.getenv("DIALOGUE_TOKEN_BUDGET", self.dialogue_token_budget))
+        self.dialogue_recent_turns = int(os.getenv("DIALOGUE_RECENT_TURNS", self.dialogue_recent_turns))
@@ -1,7 +1,15 @@
+import hashlib
 import os
+import re
 import sqlite3
+import time
+from typing import List, Tuple
 
 from src.configs_management import ConfigsManager
+from src.sql_utils import split_sql_statements
+
+MIGRATION_FILENAME_PATTERN = re.compile(r"^(\d+)(?:\D.*)?\.sql$")
+MIGRATION_LOCK_TIMEOUT = 600
 
 
 class DBConnector:
@@ -20,25 +28,65 @@ class DBConnector:
         self.migrations_dir = configs_manager.migrations_dir
         self._connection = None
 
+    def _list_migrations(self) -> List[Tuple[int, str]]:
+        migrations = []
+        for filename in os.listdir(self.migrations_dir):
+            match = MIGRATION_FILENAME_PATTERN.match(filename)
+            if match is None:
+                print(f"Файл '{filename}' пропущен: имя миграции должно начинаться с номера версии.")
+                continue
+            migrations.append((int(match.group(1)), filename))
+        migrations.sort()
+        for (version, filename), (next_version, next_filename) in zip(migrations, migrations[1:]):
+            if version == next_version:
+                raise ValueError(f"Миграции '{filename}' и '{next_filename}' имеют одинаковую версию {version}.")
+        return migrations
+
+    def _apply_migration(self, conn: sqlite3.Connection, version: int, filename: str, sql_script: str,
+                         checksum: str) -> bool:
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            if conn.execute("SELECT 1 FROM schema_migrations WHERE version = ?", (version,)).fetchone():
+                conn.rollback()
+                return False
+            for statement in split_sql_statements(sql_script):
+                conn.execute(statement)
+            conn.execute("INSERT INTO schema_migrations (version, filename, checksum, applied_at) "
+                         "VALUES (?, ?, ?, ?)", (version, filename, checksum, time.time()))
+            conn.commit()
+        except sqlite3.Error:
+            conn.rollback()
+            raise
+        return True
+
     def _run_migrations(self):
         if not os.path.exists(self.migrations_dir):
             raise FileNotFoundError(f"Директория миграций '{self.migrations_dir}' не найдена.")
         conn = self.get_connection()
-        cursor = conn.cursor()
-        for filename in sorted(os.listdir(self.migrations_dir)):
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("CREATE TABLE IF NOT EXISTS schema_migrations ("
+                     "version INTEGER PRIMARY KEY, filename TEXT, checksum TEXT, applied_at REAL)")
+        conn.commit()
+        applied = dict(conn.execute("SELECT version, checksum FROM schema_migrations").fetchall())
+        for version, filename in self._list_migrations():
             migration_path = os.path.join(self.migrations_dir, filename)
-            with open(migration_path, "r", encoding="utf-8") as file:
-                sql_script = file.read()
-                try:
-                    cursor.executescript(sql_script)
+            with open(migration_path, "rb") as file:
+                content = file.read()
+            checksum = hashlib.sha256(content).hexdigest()
+            if version in applied:
+                if applied[version] != checksum:
+                    print(f"Миграция '{filename}' была изменена после применения и не будет выполнена повторно.")
+                continue
+            try:
+                if self._apply_migration(conn, version, filename, content.decode("utf-8"), checksum):
                     print(f"Миграция '{filename}' успешно выполнена.")
-                except sqlite3.Error as e:
-                    print(f"Ошибка выполнения миграции '{filename}': {e}")
-        conn.commit()
+            except sqlite3.Error as e:
+                print(f"Ошибка выполнения миграции '{filename}': {e}")
+                raise
 
     def get_connection(self):
         if self._connection is None:
-            self._connection = sqlite3.connect(self.db_path)
+            self._connection = sqlite3.connect(self.db_path, timeout=MIGRATION_LOCK_TIMEOUT)
         return self._connection
 
     def close_connection(self):
@@ -0,0 +1,345 @@
+import asyncio
+import pathlib
+import sqlite3
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional, List, Tuple, Callable, Any
+
+from src.configs_management import ConfigsManager
+from src.db_management import DBConnector
+from src.metrics import DB_QUERY_LATENCY
+
+
+class DBRepository:
+    _instance = None
+
+    def __new__(cls):
+        if cls._instance is None:
+            cls._instance = super().__new__(cls)
+            cls._instance.__init__()
+            cls._instance._start_workers()
+        return cls._instance
+
+    def __init__(self):
+        configs_manager = ConfigsManager()
+        self.db_path = configs_manager.db_path
+        self.read_pool_size = configs_manager.db_read_pool_size
+
+    def _start_workers(self):
+        self._writer = ThreadPoolExecutor(max_workers=1, thread_name_prefix="db-writer")
+        self._migrations = self._writer.submit(self._run_migrations)
+        self._readers = ThreadPoolExecutor(max_workers=self.read_pool_size, thread_name_prefix="db-reader")
+        self._write_connection: Optional[sqlite3.Connection] = None
+        self._read_connections: List[sqlite3.Connection] = []
+        self._read_connections_lock = threading.Lock()
+        self._local = threading.local()
+
+    @staticmethod
+    def _run_migrations() -> float:
+        started_at = time.perf_counter()
+        DBConnector().close_connection()
+        elapsed = time.perf_counter() - started_at
+        print(f"Проверка миграций завершена за {elapsed:.2f} с.")
+        return elapsed
+
+    async def wait_for_migrations(self) -> float:
+        return await asyncio.wrap_future(self._migrations)
+
+    def _get_write_connection(self) -> sqlite3.Connection:
+        if self._write_connection is None:
+            conn = sqlite3.connect(self.db_path, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._write_connection = conn
+        return self._write_connection
+
+    def _get_read_connection(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "connection", None)
+        if conn is None:
+            uri = pathlib.Path(self.db_path).resolve().as_uri() + "?mode=ro"
+            conn = sqlite3.connect(uri, uri=True, check_same_thread=False)
+            self._local.connection = conn
+            with self._read_connections_lock:
+                self._read_connections.append(conn)
+        return conn
+
+    def _run_read(self, func: Callable[..., Any], args: tuple) -> Any:
+        self._migrations.result()
+        started_at = time.perf_counter()
+        try:
+            return func(self._get_read_connection(), *args)
+        finally:
+            DB_QUERY_LATENCY.observe(time.perf_counter() - started_at, "read", func.__name__.lstrip("_"))
+
+    def _run_write(self, func: Callable[..., Any], args: tuple) -> Any:
+        self._migrations.result()
+        conn = self._get_write_connection()
+        started_at = time.perf_counter()
+        try:
+            result = func(conn, *args)
+            conn.commit()
+            return result
+        except Exception:
+            conn.rollback()
+            raise
+        finally:
+            DB_QUERY_LATENCY.observe(time.perf_counter() - started_at, "write", func.__name__.lstrip("_"))
+
+    async def _read(self, func: Callable[..., Any], *args) -> Any:
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._readers, self._run_read, func, args)
+
+    async def _write(self, func: Callable[..., Any], *args) -> Any:
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._writer, self._run_write, func, args)
+
+    @staticmethod
+    def _select_user(conn: sqlite3.Connection, telegram_id: int) -> Optional[tuple]:
+        cursor = conn.execute("SELECT * FROM users "
+                              "WHERE telegram_id = ?", (telegram_id,))
+        return cursor.fetchone()
+
+    @staticmethod
+    def _insert_user(conn: sqlite3.Connection, name: str, surname: str, patronymic: str, telegram_id: int):
+        conn.execute("INSERT INTO users (name, surname, patronymic, telegram_id) "
+                     "VALUES (?, ?, ?, ?)",
+                     (name, surname, patronymic, telegram_id))
+        conn.execute("INSERT INTO stats (correct_num, incorrect_num, user_id) "
+                     "VALUES (?, ?, ?)",
+                     (0, 0, telegram_id))
+
+    @staticmethod
+    def _update_stats(conn: sqlite3.Connection, increments: List[Tuple[int, int, int]]):
+        conn.executemany("UPDATE stats "
+                         "SET correct_num = correct_num + ?, incorrect_num = incorrect_num + ? "
+                         "WHERE user_id = ?", increments)
+
+    @staticmethod
+    def _insert_actions(conn: sqlite3.Connection, actions: List[tuple]):
+        conn.executemany("INSERT INTO actions (message, timestamp, kind, error_kind, error, user_id) "
+                         "SELECT ?, ?, ?, ?, ?, telegram_id FROM users "
+                         "WHERE telegram_id = ?", actions)
+
+    @staticmethod
+    def _select_actions_before(conn: sqlite3.Connection, timestamp: str, limit: int) -> List[tuple]:
+        cursor = conn.execute("SELECT id, user_id, timestamp, message, kind, error_kind, error FROM actions "
+                              "WHERE timestamp < ? "
+                              "ORDER BY id LIMIT ?", (timestamp, limit))
+        return cursor.fetchall()
+
+    @staticmethod
+    def _delete_actions_before(conn: sqlite3.Connection, timestamp: str, max_id: int) -> int:
+        cursor = conn.execute("DELETE FROM actions "
+                              "WHERE timestamp < ? AND id <= ?", (timestamp, max_id))
+        return cursor.rowcount
+
+    @staticmethod
+    def _upsert_interval(conn: sqlite3.Connection, telegram_id: int, interval_minutes: int):
+        conn.execute("INSERT INTO scheduler (user_id, interval_minutes) "
+                     "VALUES (:1, :2) "
+                     "ON CONFLICT(user_id) DO UPDATE SET interval_minutes = :2",
+                     (telegram_id, interval_minutes))
+
+    @staticmethod
+    def _delete_interval(conn: sqlite3.Connection, telegram_id: int) -> bool:
+        cursor = conn.execute("DELETE FROM scheduler "
+                              "WHERE user_id = ?", (telegram_id,))
+        return cursor.rowcount > 0
+
+    @staticmethod
+    def _select_active_intervals(conn: sqlite3.Connection) -> List[int]:
+        cursor = conn.execute("SELECT DISTINCT interval_minutes FROM scheduler "
+                              "WHERE interval_minutes IS NOT NULL")
+        return [row[0] for row in cursor.fetchall()]
+
+    @staticmethod
+    def _select_stats_for_interval(conn: sqlite3.Connection, interval_minutes: int) -> List[Tuple[int, int, int]]:
+        cursor = conn.execute("SELECT scheduler.user_id, stats.correct_num, stats.incorrect_num "
+                              "FROM scheduler LEFT JOIN stats ON stats.user_id = scheduler.user_id "
+                              "WHERE scheduler.interval_minutes = ?", (interval_minutes,))
+        return cursor.fetchall()
+
+    @staticmethod
+    def _select_window_stats_for_interval(conn: sqlite3.Connection, interval_minutes: int, since_hour: str,
+                                          since_day: str, since_week: str) -> List[tuple]:
+        cursor = conn.execute("SELECT actions.user_id, "
+                              "SUM(actions.timestamp >= :since_hour), "
+                              "SUM(actions.timestamp >= :since_hour AND actions.kind = 'sql_error'), "
+                              "SUM(actions.timestamp >= :since_day), "
+                              "SUM(actions.timestamp >= :since_day AND actions.kind = 'sql_error'), "
+                              "COUNT(*), "
+                              "SUM(actions.kind = 'sql_error'), "
+                              "SUM(actions.error_kind = 'syntax'), "
+                              "SUM(actions.error_kind = 'unknown_object'), "
+                              "SUM(actions.error_kind = 'semantic') "
+                              "FROM scheduler JOIN actions ON actions.user_id = scheduler.user_id "
+                              "WHERE scheduler.interval_minutes = :interval_minutes "
+                              "AND actions.kind IN ('sql_correct', 'sql_error') AND actions.timestamp >= :since_week "
+                              "GROUP BY actions.user_id",
+                              {"interval_minutes": interval_minutes, "since_hour": since_hour, "since_day": since_day,
+                               "since_week": since_week})
+        return cursor.fetchall()
+
+    @staticmethod
+    def _select_frequent_errors_for_interval(conn: sqlite3.Connection, interval_minutes: int, since: str,
+                                             limit: int) -> List[Tuple[int, str, int]]:
+        cursor = conn.execute("SELECT user_id, error, errors_num FROM ("
+                              "SELECT actions.user_id, actions.error, COUNT(*) AS errors_num, "
+                              "ROW_NUMBER() OVER (PARTITION BY actions.user_id ORDER BY COUNT(*) DESC) AS position "
+                              "FROM scheduler JOIN actions ON actions.user_id = scheduler.user_id "
+                              "WHERE scheduler.interval_minutes = :1 "
+                              "AND actions.kind = 'sql_error' AND actions.timestamp >= :2 "
+                              "GROUP BY actions.user_id, actions.error) "
+                              "WHERE position <= :3 "
+                              "ORDER BY user_id, position",
+                              (interval_minutes, since, limit))
+        return cursor.fetchall()
+
+    @staticmethod
+    def _select_explanation(conn: sqlite3.Connection, cache_key: str) -> Optional[Tuple[str, float]]:
+        cursor = conn.execute("SELECT explanation, created_at FROM ai_explanations "
+                              "WHERE cache_key = ?", (cache_key,))
+        return cursor.fetchone()
+
+    @staticmethod
+    def _upsert_explanation(conn: sqlite3.Connection, cache_key: str, explanation: str, created_at: float):
+        conn.execute("INSERT INTO ai_explanations (cache_key, explanation, created_at) "
+                     "VALUES (:1, :2, :3) "
+                     "ON CONFLICT(cache_key) DO UPDATE SET explanation = :2, created_at = :3",
+                     (cache_key, explanation, created_at))
+
+    @staticmethod
+    def _delete_explanations_before(conn: sqlite3.Connection, created_before: float):
+        conn.execute("DELETE FROM ai_explanations "
+                     "WHERE created_at < ?", (created_before,))
+
+    @staticmethod
+    def _select_fsm_record(conn: sqlite3.Connection, storage_key: str) -> Optional[Tuple[str, bytes, float]]:
+        cursor = conn.execute("SELECT state, data, updated_at FROM fsm_storage "
+                              "WHERE storage_key = ?", (storage_key,))
+        return cursor.fetchone()
+
+    @staticmethod
+    def _delete_empty_fsm_record(conn: sqlite3.Connection, storage_key: str):
+        conn.execute("DELETE FROM fsm_storage "
+                     "WHERE storage_key = ? AND state IS NULL AND data IS NULL", (storage_key,))
+
+    @staticmethod
+    def _upsert_fsm_state(conn: sqlite3.Connection, storage_key: str, state: Optional[str], updated_at: float,
+                          expired_before: float):
+        conn.execute("INSERT INTO fsm_storage (storage_key, state, updated_at) "
+                     "VALUES (:1, :2, :3) "
+                     "ON CONFLICT(storage_key) DO UPDATE SET state = :2, updated_at = :3, "
+                     "data = CASE WHEN updated_at < :4 THEN NULL ELSE data END",
+                     (storage_key, state, updated_at, expired_before))
+        DBRepository._delete_empty_fsm_record(conn, storage_key)
+
+    @staticmethod
+    def _upsert_fsm_data(conn: sqlite3.Connection, storage_key: str, data: Optional[bytes], updated_at: float,
+                         expired_before: float):
+        conn.execute("INSERT INTO fsm_storage (storage_key, data, updated_at) "
+                     "VALUES (:1, :2, :3) "
+                     "ON CONFLICT(storage_key) DO UPDATE SET data = :2, updated_at = :3, "
+                     "state = CASE WHEN updated_at < :4 THEN NULL ELSE state END",
+                     (storage_key, data, updated_at, expired_before))
+        DBRepository._delete_empty_fsm_record(conn, storage_key)
+
+    @staticmethod
+    def _delete_fsm_records_before(conn: sqlite3.Connection, updated_before: float) -> int:
+        cursor = conn.execute("DELETE FROM fsm_storage "
+                              "WHERE updated_at < ?", (updated_before,))
+        return cursor.rowcount
+
+    @staticmethod
+    def _upsert_lease(conn: sqlite3.Connection, name: str, owner: str, now: float, ttl: float) -> bool:
+        conn.execute("INSERT INTO leader_leases (name, owner, expires_at) "
+                     "VALUES (:1, :2, :3 + :4) "
+                     "ON CONFLICT(name) DO UPDATE SET owner = :2, expires_at = :3 + :4 "
+                     "WHERE leader_leases.owner = :2 OR leader_leases.expires_at < :3",
+                     (name, owner, now, ttl))
+        cursor = conn.execute("SELECT owner FROM leader_leases "
+                              "WHERE name = ?", (name,))
+        return cursor.fetchone()[0] == owner
+
+    @staticmethod
+    def _delete_lease(conn: sqlite3.Connection, name: str, owner: str):
+        conn.execute("DELETE FROM leader_leases "
+                     "WHERE name = ? AND owner = ?", (name, owner))
+
+    async def get_user(self, telegram_id: int) -> Optional[tuple]:
+        return await self._read(self._select_user, telegram_id)
+
+    async def add_user(self, name: str, surname: str, patronymic: str, telegram_id: int):
+        await self._write(self._insert_user, name, surname, patronymic, telegram_id)
+
+    async def increment_stats(self, increments: List[Tuple[int, int, int]]):
+        await self._write(self._update_stats, increments)
+
+    async def log_actions(self, actions: List[tuple]):
+        await self._write(self._insert_actions, actions)
+
+    async def get_actions_before(self, timestamp: str, limit: int) -> List[tuple]:
+        return await self._read(self._select_actions_before, timestamp, limit)
+
+    async def delete_actions_before(self, timestamp: str, max_id: int) -> int:
+        return await self._write(self._delete_actions_before, timestamp, max_id)
+
+    async def upsert_interval(self, telegram_id: int, interval_minutes: int):
+        await self._write(self._upsert_interval, telegram_id, interval_minutes)
+
+    async def delete_interval(self, telegram_id: int) -> bool:
+        return await self._write(self._delete_interval, telegram_id)
+
+    async def get_active_intervals(self) -> List[int]:
+        return await self._read(self._select_active_intervals)
+
+    async def get_stats_for_interval(self, interval_minutes: int) -> List[Tuple[int, int, int]]:
+        return await self._read(self._select_stats_for_interval, interval_minutes)
+
+    async def get_window_stats_for_interval(self, interval_minutes: int, since_hour: str, since_day: str,
+                                            since_week: str) -> List[tuple]:
+        return await self._read(self._select_window_stats_for_interval, interval_minutes, since_hour, since_day,
+                                since_week)
+
+    async def get_frequent_errors_for_interval(self, interval_minutes: int, since: str,
+                                               limit: int) -> List[Tuple[int, str, int]]:
+        return await self._read(self._select_frequent_errors_for_interval, interval_minutes, since, limit)
+
+    async def get_explanation(self, cache_key: str) -> Optional[Tuple[str, float]]:
+        return await self._read(self._select_explanation, cache_key)
+
+    async def save_explanation(self, cache_key: str, explanation: str, created_at: float):
+        await self._write(self._upsert_explanation, cache_key, explanation, created_at)
+
+    async def delete_explanations_before(self, created_before: float):
+        await self._write(self._delete_explanations_before, created_before)
+
+    async def get_fsm_record(self, storage_key: str) -> Optional[Tuple[str, bytes, float]]:
+        return await self._read(self._select_fsm_record, storage_key)
+
+    async def set_fsm_state(self, storage_key: str, state: Optional[str], updated_at: float, expired_before: float):
+        await self._write(self._upsert_fsm_state, storage_key, state, updated_at, expired_before)
+
+    async def set_fsm_data(self, storage_key: str, data: Optional[bytes], updated_at: float, expired_before: float):
+        await self._write(self._upsert_fsm_data, storage_key, data, updated_at, expired_before)
+
+    async def delete_fsm_records_before(self, updated_before: float) -> int:
+        return await self._write(self._delete_fsm_records_before, updated_before)
+
+    async def acquire_lease(self, name: str, owner: str, now: float, ttl: float) -> bool:
+        return await self._write(self._upsert_lease, name, owner, now, ttl)
+
+    async def release_lease(self, name: str, owner: str):
+        await self._write(self._delete_lease, name, owner)
+
+    def close(self):
+        self._readers.shutdown(wait=True)
+        self._writer.shutdown(wait=True)
+        with self._read_connections_lock:
+            for conn in self._read_connections:
+                conn.close()
+            self._read_connections.clear()
+        if self._write_connection is not None:
+            self._write_connection.close()
+            self._write_connection = None
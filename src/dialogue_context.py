@@ -0,0 +1,66 @@
+from typing import Optional, List, Dict, Tuple
+
+from src.ai_management import AIManager
+from src.configs_management import ConfigsManager
+
+CHARS_PER_TOKEN = 3
+PINNED_MESSAGES_NUM = 2
+SUMMARY_TOKENS_RESERVE = 300
+
+
+def estimate_tokens(message: Dict[str, str]) -> int:
+    return len(message["content"]) // CHARS_PER_TOKEN + 4
+
+
+class DialogueContext:
+    def __init__(self):
+        configs_manager = ConfigsManager()
+        self.token_budget = configs_manager.dialogue_token_budget
+        self.recent_messages_num = configs_manager.dialogue_recent_turns * 2
+
+    def _count_tokens(self, messages: List[Dict[str, str]]) -> int:
+        return sum(estimate_tokens(message) for message in messages)
+
+    def _summary_message(self, summary: Optional[str]) -> List[Dict[str, str]]:
+        if not summary:
+            return []
+        return [{"role": "system", "content": f"Краткое содержание предыдущего диалога: {summary}"}]
+
+    def _select_recent(self, pinned: List[Dict[str, str]], turns: List[Dict[str, str]]) -> List[Dict[str, str]]:
+        budget = self.token_budget - self._count_tokens(pinned) - SUMMARY_TOKENS_RESERVE
+        kept = []
+        for message in reversed(turns[-self.recent_messages_num:]):
+            budget -= estimate_tokens(message)
+            if budget < 0 and kept:
+                break
+            kept.append(message)
+        return kept[::-1]
+
+    async def compact(self, message_history: List[Dict[str, str]],
+                      summary: Optional[str]) -> Tuple[List[Dict[str, str]], Optional[str]]:
+        pinned = message_history[:PINNED_MESSAGES_NUM]
+        turns = message_history[PINNED_MESSAGES_NUM:]
+        over_budget = self._count_tokens(pinned + self._summary_message(summary) + turns) > self.token_budget
+        if not over_budget and len(turns) < 2 * self.recent_messages_num:
+            return message_history, summary
+        recent = self._select_recent(pinned, turns)
+        older = turns[:len(turns) - len(recent)]
+        if not older:
+            return message_history, summary
+        new_summary = await AIManager().summarize_dialogue(summary, older)
+        if new_summary is None:
+            return message_history, summary
+        return pinned + recent, new_summary
+
+    def build_prompt(self, message_history: List[Dict[str, str]], summary: Optional[str]) -> List[Dict[str, str]]:
+        pinned = message_history[:PINNED_MESSAGES_NUM]
+        turns = message_history[PINNED_MESSAGES_NUM:]
+        pinned = pinned + self._summary_message(summary)
+        budget = self.token_budget - self._count_tokens(pinned)
+        kept = []
+        for message in reversed(turns):
+            budget -= estimate_tokens(message)
+            if budget < 0 and kept:
+                break
+            kept.append(message)
+        return pinned + kept[::-1]
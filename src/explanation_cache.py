@@ -0,0 +1,78 @@
+import time
+from collections import OrderedDict
+from typing import Optional, Dict
+
+from src.configs_management import ConfigsManager
+from src.db_repository import DBRepository
+from src.sql_utils import make_query_key
+
+
+class ExplanationCache:
+    _instance = None
+
+    def __new__(cls):
+        if cls._instance is None:
+            cls._instance = super().__new__(cls)
+            cls._instance.__init__()
+            cls._instance._initialize_cache()
+        return cls._instance
+
+    def __init__(self):
+        configs_manager = ConfigsManager()
+        self.max_size = configs_manager.explanation_cache_size
+        self.ttl = configs_manager.explanation_cache_ttl
+        self.repository = DBRepository()
+
+    def _initialize_cache(self):
+        self._entries: OrderedDict = OrderedDict()
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+
+    def get_metrics(self) -> Dict[str, float]:
+        hits = self.memory_hits + self.disk_hits
+        return {
+            "size": len(self._entries),
+            "memory_hits": self.memory_hits,
+            "disk_hits": self.disk_hits,
+            "misses": self.misses,
+            "hit_ratio": hits / max(hits + self.misses, 1),
+        }
+
+    def _is_expired(self, created_at: float) -> bool:
+        return created_at + self.ttl < time.time()
+
+    def _remember(self, key: str, explanation: str, created_at: float):
+        self._entries[key] = (explanation, created_at)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+
+    async def get(self, query: str, error_message: str) -> Optional[str]:
+        key = make_query_key(query, error_message)
+        entry = self._entries.get(key)
+        if entry is not None:
+            explanation, created_at = entry
+            if not self._is_expired(created_at):
+                self._entries.move_to_end(key)
+                self.memory_hits += 1
+                return explanation
+            del self._entries[key]
+        entry = await self.repository.get_explanation(key)
+        if entry is not None:
+            explanation, created_at = entry
+            if not self._is_expired(created_at):
+                self._remember(key, explanation, created_at)
+                self.disk_hits += 1
+                return explanation
+        self.misses += 1
+        return None
+
+    async def put(self, query: str, error_message: str, explanation: str):
+        key = make_query_key(query, error_message)
+        created_at = time.time()
+        self._remember(key, explanation, created_at)
+        await self.repository.save_explanation(key, explanation, created_at)
+
+    async def prune(self):
+        await self.repository.delete_explanations_before(time.time() - self.ttl)
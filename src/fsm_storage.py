@@ -0,0 +1,85 @@
+import asyncio
+import json
+import time
+import zlib
+from typing import Any, Dict, Optional
+
+from aiogram.fsm.state import State
+from aiogram.fsm.storage.base import BaseStorage, StateType, StorageKey, KeyBuilder, DefaultKeyBuilder
+
+from src.configs_management import ConfigsManager
+from src.db_repository import DBRepository
+
+
+class SQLiteStorage(BaseStorage):
+    def __init__(self, key_builder: Optional[KeyBuilder] = None):
+        configs_manager = ConfigsManager()
+        self.ttl = configs_manager.fsm_state_ttl
+        self.vacuum_interval = configs_manager.fsm_vacuum_interval
+        self.key_builder = key_builder or DefaultKeyBuilder(with_bot_id=True, with_destiny=True)
+        self.repository = DBRepository()
+        self._vacuum_task: Optional[asyncio.Task] = None
+
+    @staticmethod
+    def _serialize(data: Dict[str, Any]) -> Optional[bytes]:
+        if not data:
+            return None
+        return zlib.compress(json.dumps(data, ensure_ascii=False, separators=(",", ":")).encode("utf-8"))
+
+    @staticmethod
+    def _deserialize(data: Optional[bytes]) -> Dict[str, Any]:
+        if not data:
+            return {}
+        return json.loads(zlib.decompress(data).decode("utf-8"))
+
+    async def _get_record(self, key: StorageKey) -> Optional[tuple]:
+        record = await self.repository.get_fsm_record(self.key_builder.build(key))
+        if record is None:
+            return None
+        state, data, updated_at = record
+        if updated_at + self.ttl < time.time():
+            return None
+        return state, data
+
+    async def set_state(self, key: StorageKey, state: StateType = None) -> None:
+        state = state.state if isinstance(state, State) else state
+        now = time.time()
+        await self.repository.set_fsm_state(self.key_builder.build(key), state, now, now - self.ttl)
+
+    async def get_state(self, key: StorageKey) -> Optional[str]:
+        record = await self._get_record(key)
+        return record[0] if record else None
+
+    async def set_data(self, key: StorageKey, data: Dict[str, Any]) -> None:
+        now = time.time()
+        await self.repository.set_fsm_data(self.key_builder.build(key), self._serialize(data), now, now - self.ttl)
+
+    async def get_data(self, key: StorageKey) -> Dict[str, Any]:
+        record = await self._get_record(key)
+        return self._deserialize(record[1]) if record else {}
+
+    async def vacuum(self) -> int:
+        return await self.repository.delete_fsm_records_before(time.time() - self.ttl)
+
+    async def _vacuum_loop(self):
+        while True:
+            await asyncio.sleep(self.vacuum_interval)
+            try:
+                removed = await self.vacuum()
+                if removed:
+                    print(f"Удалено устаревших диалогов: {removed}")
+            except Exception as e:
+                print(f"Ошибка очистки хранилища состояний: {e}")
+
+    async def start(self):
+        if self._vacuum_task is None:
+            self._vacuum_task = asyncio.create_task(self._vacuum_loop())
+
+    async def close(self) -> None:
+        if self._vacuum_task is not None:
+            self._vacuum_task.cancel()
+            try:
+                await self._vacuum_task
+            except asyncio.CancelledError:
+                pass
+            self._vacuum_task = None
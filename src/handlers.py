@@ -1,25 +1,36 @@
-import sqlite3
-from sqlite3 import OperationalError
-from typing import List
+from typing import List, Optional
 
 from aiogram import Bot, Dispatcher, Router, F
 from aiogram.fsm.context import FSMContext
 from aiogram.fsm.state import State, StatesGroup
-from aiogram.fsm.storage.memory import MemoryStorage
 from aiogram.types import (Message, BotCommand, KeyboardButton, ReplyKeyboardMarkup, InlineKeyboardMarkup,
                            InlineKeyboardButton, CallbackQuery)
-from apscheduler.jobstores.base import JobLookupError
 
+from src.action_logging import ActionLogger, ACTION_SQL_CORRECT, ACTION_SQL_ERROR
 from src.ai_management import AIManager
 from src.configs_management import ConfigsManager
-from src.db_management import DBConnector
+from src.db_repository import DBRepository
+from src.dialogue_context import DialogueContext
+from src.fsm_storage import SQLiteStorage
+from src.metrics import SQL_LINT_RESULTS
 from src.periodic_messages import StatsNotifier
-from src.middlewares import RegistrationMiddleware, LoggingMiddleware
-
-db_connector = DBConnector()
+from src.sql_lint import lint_sql, LintResult, RULE_DESCRIPTIONS
+from src.sql_utils import split_sql_statements
+from src.sql_validation import SQLValidator, ValidationResult
+from src.stats_accumulator import StatsAccumulator
+from src.streaming import answer_streaming, split_long_text
+from src.middlewares import RegistrationMiddleware, LoggingMiddleware, MetricsMiddleware
+from src.outbound import OutboundDispatcher
+from src.user_cache import UserCache
+
+repository = DBRepository()
+user_cache = UserCache()
+stats_accumulator = StatsAccumulator()
+action_logger = ActionLogger()
 configs_manager = ConfigsManager()
 bot = Bot(token=configs_manager.bot_token)
-dp = Dispatcher(storage=MemoryStorage())
+bot.session.middleware(OutboundDispatcher())
+dp = Dispatcher(storage=SQLiteStorage())
 registration_router = Router()
 router = Router()
 dp.include_router(router)
@@ -50,6 +61,9 @@ async def set_commands():
 
 
 def register_middlewares():
+    registration_router.message.middleware(MetricsMiddleware())
+    router.message.middleware(MetricsMiddleware())
+    router.callback_query.middleware(MetricsMiddleware())
     registration_router.message.middleware(RegistrationMiddleware())
     registration_router.message.middleware(LoggingMiddleware())
     router.message.middleware(LoggingMiddleware())
@@ -75,12 +89,7 @@ async def menu_command(message: Message):
 async def start_command(message: Message):
     keyboard = create_main_keyboard()
     telegram_id = message.from_user.id
-    conn = db_connector.get_connection()
-    cursor = conn.cursor()
-    cursor.execute("SELECT * FROM users "
-                   "WHERE telegram_id = ?", (telegram_id,))
-    user = cursor.fetchone()
-    if user:
+    if await user_cache.is_registered(telegram_id):
         await message.answer("Вы уже зарегистрированы! Используйте /check_sql для проверки запросов.",
                              reply_markup=keyboard)
     else:
@@ -92,12 +101,7 @@ async def start_command(message: Message):
 @router.message(F.text == "Регистрация")
 async def register_command(message: Message, state: FSMContext):
     telegram_id = message.from_user.id
-    conn = db_connector.get_connection()
-    cursor = conn.cursor()
-    cursor.execute("SELECT * FROM users "
-                   "WHERE telegram_id = ?", (telegram_id,))
-    user = cursor.fetchone()
-    if user:
+    if await user_cache.is_registered(telegram_id):
         await message.answer("Вы уже зарегистрированы!")
         return
     await message.answer("Введите вашу фамилию:")
@@ -125,19 +129,8 @@ async def process_patronymic(message: Message, state: FSMContext):
     surname = user_data["surname"]
     patronymic = message.text
     telegram_id = message.from_user.id
-    conn = db_connector.get_connection()
-    cursor = conn.cursor()
-    cursor.execute(
-        "INSERT INTO users (name, surname, patronymic, telegram_id) "
-        "VALUES (?, ?, ?, ?)",
-        (name, surname, patronymic, telegram_id)
-    )
-    cursor.execute(
-        "INSERT INTO stats (correct_num, incorrect_num, user_id) "
-        "VALUES (?, ?, ?)",
-        (0, 0, telegram_id)
-    )
-    conn.commit()
+    await repository.add_user(name, surname, patronymic, telegram_id)
+    user_cache.mark_registered(telegram_id)
     await message.answer(f"Регистрация завершена! Добро пожаловать, {name}.")
     await state.clear()
 
@@ -160,25 +153,46 @@ def init_message_history(sql_query: str, exception: Exception, help_message: str
     return message_history
 
 
-async def on_correct_sql_query(cursor, telegram_id: int, conn, message: Message):
-    cursor.execute("UPDATE stats "
-                   "SET correct_num = correct_num + 1 "
-                   "WHERE user_id = ?", (telegram_id,))
-    conn.commit()
+def log_check_result(telegram_id: int, sql_query: str, error: Optional[Exception] = None,
+                     lint_result: Optional[LintResult] = None):
+    if error is None:
+        action_logger.log(telegram_id, sql_query, kind=ACTION_SQL_CORRECT)
+        return
+    mistake = RULE_DESCRIPTIONS[lint_result.rule] if lint_result else str(error)
+    action_logger.log(telegram_id, sql_query, kind=ACTION_SQL_ERROR, error_kind=SQLValidator.classify_error(error),
+                      error=mistake)
+
+
+async def on_correct_sql_query(telegram_id: int, message: Message, sql_query: str):
+    stats_accumulator.add(telegram_id, correct=1)
+    log_check_result(telegram_id, sql_query)
     await message.answer("Ваш запрос корректен.")
 
 
-async def on_incorrect_sql_command(cursor, telegram_id: int, conn, message: Message, sql_query: str,
-                                   e: Exception, state: FSMContext):
-    cursor.execute("UPDATE stats "
-                   "SET incorrect_num = incorrect_num + 1 "
-                   "WHERE user_id = ?", (telegram_id,))
-    conn.commit()
+async def on_incorrect_sql_command(telegram_id: int, message: Message, sql_query: str, e: Exception,
+                                   state: FSMContext):
+    stats_accumulator.add(telegram_id, incorrect=1)
+    lint_result = lint_sql(sql_query, str(e))
+    log_check_result(telegram_id, sql_query, e, lint_result)
     await message.answer(f"Ошибка в запросе: {e}")
+    await start_error_dialogue(message, sql_query, e, state, lint_result)
+
+
+async def start_error_dialogue(message: Message, sql_query: str, e: Exception, state: FSMContext,
+                               lint_result: Optional[LintResult]):
     ai_manager = AIManager()
-    help_message = await ai_manager.get_sql_error_help(sql_query, str(e))
-    await message.answer(f"Анализ ошибки:\n\n{help_message}")
-    await state.update_data(message_history=init_message_history(sql_query, e, help_message))
+    SQL_LINT_RESULTS.inc(lint_result.rule if lint_result else "none")
+    if lint_result is not None:
+        help_message = lint_result.explanation
+        await message.answer(f"Анализ ошибки:\n\n{help_message}")
+    elif configs_manager.ai_streaming:
+        help_message = await answer_streaming(message, ai_manager.stream_sql_error_help(sql_query, str(e)),
+                                              prefix="Анализ ошибки:\n\n")
+    else:
+        help_message = await ai_manager.get_sql_error_help(sql_query, str(e))
+        await message.answer(f"Анализ ошибки:\n\n{help_message}")
+    await state.update_data(message_history=init_message_history(sql_query, e, help_message),
+                            history_summary=None)
     await state.set_state(SQLDialogStates.in_conversation)
     await message.answer("Теперь вы можете задавать дополнительные вопросы. "
                          "Для завершения диалога используйте /quit")
@@ -188,10 +202,6 @@ async def on_incorrect_sql_command(cursor, telegram_id: int, conn, message: Mess
 @registration_router.message(F.text.startswith("Проверка SQL-запроса"))
 async def check_sql_command(message: Message, state: FSMContext):
     telegram_id = message.from_user.id
-    conn = db_connector.get_connection()
-    cursor = conn.cursor()
-    cursor.execute("SELECT * FROM users "
-                   "WHERE telegram_id = ?", (telegram_id,))
     if message.text.startswith("/check_sql"):
         sql_query = message.text[len("/check_sql "):].strip()
     else:
@@ -199,17 +209,66 @@ async def check_sql_command(message: Message, state: FSMContext):
     if not sql_query:
         await message.answer("Пожалуйста, укажите SQL-запрос после команды, например: `/check_sql SELECT * FROM users`")
         return
-    try:
-        conn = sqlite3.connect(":memory:")
-        conn.execute(f"EXPLAIN {sql_query}")
-        await on_correct_sql_query(cursor, telegram_id, conn, message)
-    except OperationalError as e:
-        syntax_error_list = ["syntax error", "unrecognized token", "incomplete input"]
-        comparisons = [item in str(e).lower() for item in syntax_error_list]
-        if any(comparisons):
-            await on_incorrect_sql_command(cursor, telegram_id, conn, message, sql_query, e, state)
-            return
-        await on_correct_sql_query(cursor, telegram_id, conn, message)
+    statements = split_sql_statements(sql_query)
+    if len(statements) > 1:
+        await check_sql_batch(message, state, statements)
+        return
+    validator = SQLValidator()
+    result = await validator.validate(sql_query)
+    if validator.counts_as_error(result):
+        await on_incorrect_sql_command(telegram_id, message, sql_query, result.error, state)
+        return
+    await on_correct_sql_query(telegram_id, message, sql_query)
+
+
+def format_statement_report(index: int, statement: str, result: ValidationResult, is_error: bool) -> str:
+    preview = " ".join(statement.split())
+    if len(preview) > 60:
+        preview = preview[:57] + "..."
+    if is_error:
+        return f"{index}. {preview}\n   Ошибка: {result.error}"
+    return f"{index}. {preview}\n   Корректен"
+
+
+async def check_sql_batch(message: Message, state: FSMContext, statements: List[str]):
+    telegram_id = message.from_user.id
+    if len(statements) > configs_manager.max_batch_statements:
+        await message.answer(f"Слишком много запросов в одном сообщении. "
+                             f"Максимум: {configs_manager.max_batch_statements}.")
+        return
+    validator = SQLValidator()
+    results = await validator.validate_batch(statements)
+    errors = [validator.counts_as_error(result) for result in results]
+    incorrect_num = sum(errors)
+    stats_accumulator.add(telegram_id, correct=len(statements) - incorrect_num, incorrect=incorrect_num)
+    lint_results = [lint_sql(statement, str(result.error)) if is_error else None
+                    for statement, result, is_error in zip(statements, results, errors)]
+    for statement, result, is_error, lint_result in zip(statements, results, errors, lint_results):
+        log_check_result(telegram_id, statement, result.error if is_error else None, lint_result)
+    report_lines = [f"Проверено запросов: {len(statements)}, корректных: {len(statements) - incorrect_num}, "
+                    f"с ошибками: {incorrect_num}.", ""]
+    for index, (statement, result, is_error) in enumerate(zip(statements, results, errors), start=1):
+        report_lines.append(format_statement_report(index, statement, result, is_error))
+    for part in split_long_text("\n".join(report_lines)):
+        await message.answer(part)
+    if incorrect_num:
+        first_error = errors.index(True)
+        await start_error_dialogue(message, statements[first_error], results[first_error].error, state,
+                                   lint_results[first_error])
+
+
+@registration_router.message(F.document.file_name.endswith(".sql"))
+async def check_sql_file(message: Message, state: FSMContext):
+    if message.document.file_size and message.document.file_size > configs_manager.max_sql_file_size:
+        await message.answer("Файл слишком большой для проверки.")
+        return
+    file = await bot.download(message.document)
+    script = file.read().decode("utf-8", errors="replace")
+    statements = split_sql_statements(script)
+    if not statements:
+        await message.answer("Файл не содержит SQL-запросов.")
+        return
+    await check_sql_batch(message, state, statements)
 
 
 @router.message(SQLDialogStates.in_conversation)
@@ -219,14 +278,21 @@ async def handle_sql_conversation(message: Message, state: FSMContext):
         await message.answer("Диалог с помощником завершен. Используйте /check_sql для новой проверки запроса.")
         return
     ai_manager = AIManager()
+    dialogue_context = DialogueContext()
     state_data = await state.get_data()
     message_history = state_data.get('message_history', [])
     message_history.append({"role": "user", "content": message.text})
     try:
-        response_text = await ai_manager.continue_dialogue(message_history)
+        message_history, history_summary = await dialogue_context.compact(message_history,
+                                                                          state_data.get('history_summary'))
+        prompt = dialogue_context.build_prompt(message_history, history_summary)
+        if configs_manager.ai_streaming:
+            response_text = await answer_streaming(message, ai_manager.stream_dialogue(prompt))
+        else:
+            response_text = await ai_manager.continue_dialogue(prompt)
+            await message.answer(response_text)
         message_history.append({"role": "assistant", "content": response_text})
-        await state.update_data(message_history=message_history)
-        await message.answer(response_text)
+        await state.update_data(message_history=message_history, history_summary=history_summary)
     except Exception as e:
         await message.answer(f"Произошла ошибка при обработке вашего вопроса: {e}")
 
@@ -253,13 +319,7 @@ async def stats_command(message: Message):
 async def set_interval(callback: CallbackQuery):
     interval_minutes = int(callback.data.split("_")[1])
     telegram_id = callback.from_user.id
-    conn = db_connector.get_connection()
-    cursor = conn.cursor()
-    cursor.execute("INSERT INTO scheduler (user_id, interval_minutes) "
-                   "VALUES (:1, :2) "
-                   "ON CONFLICT(user_id) DO UPDATE SET interval_minutes = :2",
-                   (telegram_id, interval_minutes))
-    conn.commit()
+    await repository.upsert_interval(telegram_id, interval_minutes)
     stats_sender = StatsNotifier(bot)
     stats_sender.schedule_task_for_user(telegram_id, interval_minutes)
     await callback.message.edit_text(
@@ -270,11 +330,10 @@ async def set_interval(callback: CallbackQuery):
 @registration_router.message(F.text.startswith("/stop_notifications"))
 async def stop_notifications_command(message: Message):
     telegram_id = message.from_user.id
-    try:
-        stats_sender = StatsNotifier(bot)
-        stats_sender.cancel_task_for_user(telegram_id)
+    stats_sender = StatsNotifier(bot)
+    if await stats_sender.cancel_task_for_user(telegram_id):
         await message.answer("Периодическая отправка сообщений остановлена.")
-    except JobLookupError:
+    else:
         await message.answer("У вас нет активных периодических задач.")
 
 
@@ -0,0 +1,65 @@
+import asyncio
+import os
+import socket
+import time
+import uuid
+from typing import Optional
+
+from src.configs_management import ConfigsManager
+from src.db_repository import DBRepository
+
+STATS_NOTIFIER_LEASE = "stats_notifier"
+
+
+class LeaderElection:
+    _instance = None
+
+    def __new__(cls):
+        if cls._instance is None:
+            cls._instance = super().__new__(cls)
+            cls._instance.__init__()
+            cls._instance._initialize_lease()
+        return cls._instance
+
+    def __init__(self):
+        configs_manager = ConfigsManager()
+        self.lease_ttl = configs_manager.leader_lease_ttl
+        self.repository = DBRepository()
+
+    def _initialize_lease(self):
+        self.owner = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+        self.is_leader = False
+        self._renew_task: Optional[asyncio.Task] = None
+
+    async def renew(self) -> bool:
+        try:
+            is_leader = await self.repository.acquire_lease(STATS_NOTIFIER_LEASE, self.owner, time.time(),
+                                                            self.lease_ttl)
+        except Exception as e:
+            print(f"Ошибка продления лидерства: {e}")
+            is_leader = False
+        if is_leader != self.is_leader:
+            print(f"Процесс {self.owner} {'стал' if is_leader else 'перестал быть'} ведущим.")
+        self.is_leader = is_leader
+        return is_leader
+
+    async def _renew_loop(self):
+        while True:
+            await self.renew()
+            await asyncio.sleep(self.lease_ttl / 3)
+
+    async def start(self):
+        if self._renew_task is None:
+            self._renew_task = asyncio.create_task(self._renew_loop())
+
+    async def stop(self):
+        if self._renew_task is not None:
+            self._renew_task.cancel()
+            try:
+                await self._renew_task
+            except asyncio.CancelledError:
+                pass
+            self._renew_task = None
+        if self.is_leader:
+            await self.repository.release_lease(STATS_NOTIFIER_LEASE, self.owner)
+            self.is_leader = False
@@ -0,0 +1,164 @@
+import threading
+from typing import Optional, List, Dict, Tuple, Callable
+
+from aiohttp import web
+
+from src.configs_management import ConfigsManager
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+
+def _format_labels(label_names: Tuple[str, ...], label_values: Tuple[str, ...], extra: str = "") -> str:
+    pairs = [f'{name}="{value}"' for name, value in zip(label_names, label_values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+class Counter:
+    def __init__(self, name: str, description: str, label_names: Tuple[str, ...] = ()):
+        self.name = name
+        self.description = description
+        self.label_names = label_names
+        self._values: Dict[Tuple[str, ...], float] = {}
+        self._lock = threading.Lock()
+        MetricsRegistry().register(self)
+
+    def inc(self, *label_values: str, amount: float = 1):
+        with self._lock:
+            self._values[label_values] = self._values.get(label_values, 0) + amount
+
+    def collect(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.description}", f"# TYPE {self.name} counter"]
+        with self._lock:
+            for label_values, value in sorted(self._values.items()):
+                lines.append(f"{self.name}{_format_labels(self.label_names, label_values)} {value}")
+        return lines
+
+
+class Histogram:
+    def __init__(self, name: str, description: str, label_names: Tuple[str, ...] = (),
+                 buckets: Tuple[float, ...] = DEFAULT_BUCKETS):
+        self.name = name
+        self.description = description
+        self.label_names = label_names
+        self.buckets = buckets
+        self._values: Dict[Tuple[str, ...], list] = {}
+        self._lock = threading.Lock()
+        MetricsRegistry().register(self)
+
+    def observe(self, value: float, *label_values: str):
+        with self._lock:
+            series = self._values.get(label_values)
+            if series is None:
+                series = [[0] * len(self.buckets), 0, 0.0]
+                self._values[label_values] = series
+            bucket_counts = series[0]
+            for index, bound in enumerate(self.buckets):
+                if value <= bound:
+                    bucket_counts[index] += 1
+                    break
+            series[1] += 1
+            series[2] += value
+
+    def collect(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.description}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            for label_values, (bucket_counts, count, total) in sorted(self._values.items()):
+                cumulative = 0
+                for bound, bucket_count in zip(self.buckets, bucket_counts):
+                    cumulative += bucket_count
+                    labels = _format_labels(self.label_names, label_values, f'le="{bound}"')
+                    lines.append(f"{self.name}_bucket{labels} {cumulative}")
+                labels = _format_labels(self.label_names, label_values, 'le="+Inf"')
+                lines.append(f"{self.name}_bucket{labels} {count}")
+                labels = _format_labels(self.label_names, label_values)
+                lines.append(f"{self.name}_count{labels} {count}")
+                lines.append(f"{self.name}_sum{labels} {total}")
+        return lines
+
+
+class MetricsRegistry:
+    _instance = None
+
+    def __new__(cls):
+        if cls._instance is None:
+            cls._instance = super().__new__(cls)
+            cls._instance._metrics = []
+            cls._instance._gauge_sources = []
+        return cls._instance
+
+    def register(self, metric):
+        self._metrics.append(metric)
+
+    def register_gauges(self, prefix: str, source: Callable[[], Dict[str, float]]):
+        self._gauge_sources.append((prefix, source))
+
+    def render(self) -> str:
+        lines = []
+        for metric in self._metrics:
+            lines.extend(metric.collect())
+        for prefix, source in self._gauge_sources:
+            try:
+                values = source()
+            except Exception as e:
+                print(f"Ошибка сбора метрик '{prefix}': {e}")
+                continue
+            for key, value in values.items():
+                lines.append(f"# TYPE {prefix}_{key} gauge")
+                lines.append(f"{prefix}_{key} {value}")
+        return "\n".join(lines) + "\n"
+
+
+HANDLER_LATENCY = Histogram("bot_handler_duration_seconds", "Время обработки обновления обработчиком",
+                            ("event", "handler"))
+HANDLER_ERRORS = Counter("bot_handler_errors_total", "Число исключений в обработчиках", ("event", "handler"))
+DB_QUERY_LATENCY = Histogram("bot_db_query_duration_seconds", "Время выполнения запроса к базе данных",
+                             ("kind", "operation"))
+LLM_LATENCY = Histogram("bot_llm_request_duration_seconds", "Время ответа GigaChat", ("operation", "outcome"))
+SQL_LINT_RESULTS = Counter("bot_sql_lint_total", "Результаты локального анализа ошибок без обращения к GigaChat",
+                           ("rule",))
+STATS_SEND_LATENCY = Histogram("bot_stats_send_duration_seconds", "Время отправки статистики пользователю",
+                               ("outcome",))
+STATS_TICK_LATENCY = Histogram("bot_stats_tick_duration_seconds", "Время рассылки статистики для интервала",
+                               ("interval_minutes",))
+
+
+class MetricsServer:
+    _instance = None
+
+    def __new__(cls):
+        if cls._instance is None:
+            cls._instance = super().__new__(cls)
+            cls._instance.__init__()
+            cls._instance._initialize_server()
+        return cls._instance
+
+    def __init__(self):
+        configs_manager = ConfigsManager()
+        self.host = configs_manager.metrics_host
+        self.port = configs_manager.metrics_port
+
+    def _initialize_server(self):
+        self.worker_index = 0
+        self._runner: Optional[web.AppRunner] = None
+
+    @staticmethod
+    async def _handle_metrics(request: web.Request) -> web.Response:
+        return web.Response(text=MetricsRegistry().render(), content_type="text/plain", charset="utf-8")
+
+    async def start(self):
+        if self.port is None or self._runner is not None:
+            return
+        app = web.Application()
+        app.router.add_get("/metrics", self._handle_metrics)
+        self._runner = web.AppRunner(app, access_log=None)
+        await self._runner.setup()
+        port = self.port + self.worker_index
+        await web.TCPSite(self._runner, self.host, port).start()
+        print(f"Метрики доступны по адресу http://{self.host}:{port}/metrics")
+
+    async def stop(self):
+        if self._runner is not None:
+            await self._runner.cleanup()
+            self._runner = None
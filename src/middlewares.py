@@ -1,25 +1,23 @@
+import time
 from typing import Callable, Dict, Any, Awaitable
 
 from aiogram import BaseMiddleware
-from aiogram.types import Message
+from aiogram.types import Message, TelegramObject
 
-from src.db_management import DBConnector
+from src.action_logging import ActionLogger
+from src.metrics import HANDLER_LATENCY, HANDLER_ERRORS
+from src.user_cache import UserCache
 
 
 class RegistrationMiddleware(BaseMiddleware):
     def __init__(self):
         super().__init__()
-        self.db_connector = DBConnector()
+        self.user_cache = UserCache()
 
     async def __call__(self, handler: Callable[[Message, Dict[str, Any]], Awaitable[Any]],
                        event: Message, data: Dict[str, Any]):
         telegram_id = event.from_user.id
-        conn = self.db_connector.get_connection()
-        cursor = conn.cursor()
-        cursor.execute("SELECT telegram_id FROM users"
-                       " WHERE telegram_id = ?", (telegram_id,))
-        user = cursor.fetchone()
-        if not user:
+        if not await self.user_cache.is_registered(telegram_id):
             await event.answer("Вы не зарегистрированы, заполните анкету")
             return
         return await handler(event, data)
@@ -28,21 +26,29 @@ class RegistrationMiddleware(BaseMiddleware):
 class LoggingMiddleware(BaseMiddleware):
     def __init__(self):
         super().__init__()
-        self.db_connector = DBConnector()
+        self.action_logger = ActionLogger()
+        self.user_cache = UserCache()
 
     async def __call__(self, handler: Callable[[Message, Dict[str, Any]], Awaitable[Any]],
                        event: Message, data: Dict[str, Any]):
         telegram_id = event.from_user.id
         user_message = event.text
-        if user_message:
-            conn = self.db_connector.get_connection()
-            cursor = conn.cursor()
-            cursor.execute("SELECT telegram_id FROM users "
-                           "WHERE telegram_id = ?", (telegram_id,))
-            user = cursor.fetchone()
-            if user:
-                cursor.execute("INSERT INTO actions (message, timestamp, user_id) "
-                               "VALUES (?, datetime('now'), ?)",
-                               (user_message, telegram_id))
-                conn.commit()
+        if user_message and await self.user_cache.is_registered(telegram_id):
+            self.action_logger.log(telegram_id, user_message)
         return await handler(event, data)
+
+
+class MetricsMiddleware(BaseMiddleware):
+    async def __call__(self, handler: Callable[[TelegramObject, Dict[str, Any]], Awaitable[Any]],
+                       event: TelegramObject, data: Dict[str, Any]):
+        handler_object = data.get("handler")
+        handler_name = handler_object.callback.__name__ if handler_object is not None else "unknown"
+        event_name = type(event).__name__
+        started_at = time.perf_counter()
+        try:
+            return await handler(event, data)
+        except Exception:
+            HANDLER_ERRORS.inc(event_name, handler_name)
+            raise
+        finally:
+            HANDLER_LATENCY.observe(time.perf_counter() - started_at, event_name, handler_name)
@@ -0,0 +1,159 @@
+import asyncio
+import heapq
+import itertools
+import time
+from collections import OrderedDict
+from contextvars import ContextVar
+from typing import Optional, List, Dict
+
+from aiogram import Bot
+from aiogram.client.session.middlewares.base import BaseRequestMiddleware, NextRequestMiddlewareType
+from aiogram.exceptions import TelegramRetryAfter
+from aiogram.methods import Response, TelegramMethod
+from aiogram.methods.base import TelegramType
+
+from src.configs_management import ConfigsManager
+
+PRIORITY_INTERACTIVE = 0
+PRIORITY_BULK = 1
+MAX_TRACKED_CHATS = 10000
+
+outbound_priority: ContextVar[int] = ContextVar("outbound_priority", default=PRIORITY_INTERACTIVE)
+
+
+class TokenBucket:
+    def __init__(self, rate: float, capacity: float):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated_at = time.monotonic()
+
+    def _refill(self):
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated_at) * self.rate)
+        self.updated_at = now
+
+    def wait_time(self) -> float:
+        self._refill()
+        if self.tokens >= 1:
+            return 0.0
+        return (1 - self.tokens) / self.rate
+
+    def consume(self):
+        self._refill()
+        self.tokens -= 1
+
+    def reserve(self) -> float:
+        self.consume()
+        return max(0.0, -self.tokens / self.rate)
+
+
+class OutboundDispatcher(BaseRequestMiddleware):
+    _instance = None
+
+    def __new__(cls):
+        if cls._instance is None:
+            cls._instance = super().__new__(cls)
+            cls._instance.__init__()
+            cls._instance._initialize_limits()
+        return cls._instance
+
+    def __init__(self):
+        configs_manager = ConfigsManager()
+        self.global_rate = configs_manager.outbound_global_rate
+        self.chat_rate = configs_manager.outbound_chat_rate
+        self.chat_burst = configs_manager.outbound_chat_burst
+        self.max_retries = configs_manager.outbound_max_retries
+
+    def _initialize_limits(self):
+        self.global_bucket = TokenBucket(self.global_rate, self.global_rate)
+        self._chat_buckets: OrderedDict = OrderedDict()
+        self._waiters: List[tuple] = []
+        self._sequence = itertools.count()
+        self._wakeup = asyncio.Event()
+        self._pump_task: Optional[asyncio.Task] = None
+        self.sent_requests = 0
+        self.retried_requests = 0
+        self.failed_requests = 0
+        self.wait_time_by_priority: Dict[int, float] = {PRIORITY_INTERACTIVE: 0.0, PRIORITY_BULK: 0.0}
+
+    def get_metrics(self) -> Dict[str, float]:
+        return {
+            "queue_depth": len(self._waiters),
+            "tracked_chats": len(self._chat_buckets),
+            "sent": self.sent_requests,
+            "retried": self.retried_requests,
+            "failed": self.failed_requests,
+            "interactive_wait_seconds": self.wait_time_by_priority[PRIORITY_INTERACTIVE],
+            "bulk_wait_seconds": self.wait_time_by_priority[PRIORITY_BULK],
+        }
+
+    def _get_chat_bucket(self, chat_id: int) -> TokenBucket:
+        bucket = self._chat_buckets.get(chat_id)
+        if bucket is None:
+            bucket = TokenBucket(self.chat_rate, self.chat_burst)
+            self._chat_buckets[chat_id] = bucket
+            while len(self._chat_buckets) > MAX_TRACKED_CHATS:
+                self._chat_buckets.popitem(last=False)
+        self._chat_buckets.move_to_end(chat_id)
+        return bucket
+
+    async def _pump(self):
+        while True:
+            if not self._waiters:
+                self._wakeup.clear()
+                await self._wakeup.wait()
+                continue
+            delay = self.global_bucket.wait_time()
+            if delay:
+                await asyncio.sleep(delay)
+                continue
+            _, _, future = heapq.heappop(self._waiters)
+            if future.done():
+                continue
+            self.global_bucket.consume()
+            future.set_result(None)
+
+    async def _acquire(self, chat_id: int, priority: int):
+        started_at = time.monotonic()
+        delay = self._get_chat_bucket(chat_id).reserve()
+        if delay:
+            await asyncio.sleep(delay)
+        future = asyncio.get_running_loop().create_future()
+        heapq.heappush(self._waiters, (priority, next(self._sequence), future))
+        self._wakeup.set()
+        if self._pump_task is None or self._pump_task.done():
+            self._pump_task = asyncio.create_task(self._pump())
+        await future
+        self.wait_time_by_priority[priority] += time.monotonic() - started_at
+
+    async def __call__(self, make_request: NextRequestMiddlewareType[TelegramType], bot: Bot,
+                       method: TelegramMethod[TelegramType]) -> Response[TelegramType]:
+        chat_id = getattr(method, "chat_id", None)
+        if chat_id is None:
+            return await make_request(bot, method)
+        priority = outbound_priority.get()
+        for attempt in range(self.max_retries + 1):
+            await self._acquire(chat_id, priority)
+            try:
+                response = await make_request(bot, method)
+                self.sent_requests += 1
+                return response
+            except TelegramRetryAfter as e:
+                if attempt == self.max_retries:
+                    self.failed_requests += 1
+                    raise
+                self.retried_requests += 1
+                await asyncio.sleep(e.retry_after)
+            except Exception:
+                self.failed_requests += 1
+                raise
+
+    async def stop(self):
+        if self._pump_task is not None:
+            self._pump_task.cancel()
+            try:
+                await self._pump_task
+            except asyncio.CancelledError:
+                pass
+            self._pump_task = None
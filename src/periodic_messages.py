@@ -1,8 +1,24 @@
-from typing import List, Tuple
+import asyncio
+import random
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Tuple, Optional, List, Dict
 from apscheduler.schedulers.asyncio import AsyncIOScheduler
 from apscheduler.triggers.interval import IntervalTrigger
 from aiogram import Bot
-from src.db_management import DBConnector
+from src.configs_management import ConfigsManager
+from src.db_repository import DBRepository
+from src.leadership import LeaderElection
+from src.metrics import STATS_SEND_LATENCY, STATS_TICK_LATENCY
+from src.outbound import outbound_priority, PRIORITY_BULK
+from src.stats_accumulator import StatsAccumulator
+
+FREQUENT_ERRORS_NUM = 3
+ERROR_KIND_NAMES = (("синтаксис", 6), ("несуществующие объекты", 7), ("прочие", 8))
+
+
+def format_timestamp(moment: datetime) -> str:
+    return moment.strftime("%Y-%m-%d %H:%M:%S")
 
 
 class StatsNotifier:
@@ -17,61 +33,116 @@ class StatsNotifier:
 
     def __init__(self, bot: Bot):
         self.bot = bot
-        self.db_connector = DBConnector()
+        self.repository = DBRepository()
+        configs_manager = ConfigsManager()
+        self.dispatch_spread = configs_manager.stats_dispatch_spread
+        self.jobs_sync_interval = configs_manager.stats_jobs_sync_interval
 
     def start(self):
         self.scheduler = AsyncIOScheduler()
-        self._schedule_tasks_for_all_users()
+        self.scheduler.add_job(self._sync_tasks_for_all_intervals,
+                               trigger=IntervalTrigger(seconds=self.jobs_sync_interval),
+                               next_run_time=datetime.now(timezone.utc),
+                               name="Statistics Notifications sync", id="stats_notifier_sync")
         self.scheduler.start()
 
-    def _schedule_tasks_for_all_users(self):
-        users = self._get_users_with_intervals()
-        for telegram_id, interval_minutes in users:
-            self.schedule_task_for_user(telegram_id, interval_minutes)
+    async def _sync_tasks_for_all_intervals(self):
+        try:
+            active_intervals = set(await self.repository.get_active_intervals())
+        except Exception as e:
+            print(f"Ошибка синхронизации рассылки статистики: {e}")
+            return
+        for interval_minutes in active_intervals:
+            self.schedule_task_for_interval(interval_minutes)
+        for job in self.scheduler.get_jobs():
+            interval_minutes = job.kwargs.get("interval_minutes")
+            if interval_minutes is not None and interval_minutes not in active_intervals:
+                job.remove()
 
-    def _get_users_with_intervals(self) -> List[tuple]:
-        conn = self.db_connector.get_connection()
-        cursor = conn.cursor()
-        cursor.execute("SELECT user_id, interval_minutes FROM scheduler WHERE interval_minutes IS NOT NULL")
-        return cursor.fetchall()
-
-    def schedule_task_for_user(self, telegram_id: int, interval_minutes: int):
+    def schedule_task_for_interval(self, interval_minutes: int):
+        job_id = f"stats_notifier_{interval_minutes}m"
+        if self.scheduler.get_job(job_id):
+            return
         self.scheduler.add_job(
-            self._send_statistics_to_user,
+            self._send_statistics_for_interval,
             trigger=IntervalTrigger(minutes=interval_minutes),
-            args=(telegram_id,),
-            name=f"Statistics Notification for {telegram_id}",
-            id=f"stats_notifier_{telegram_id}",
+            kwargs={"interval_minutes": interval_minutes},
+            name=f"Statistics Notification every {interval_minutes} minutes",
+            id=job_id,
             replace_existing=True,
         )
 
-    def cancel_task_for_user(self, telegram_id: int):
-        self.scheduler.remove_job(f"stats_notifier_{telegram_id}")
-        conn = self.db_connector.get_connection()
-        cursor = conn.cursor()
-        cursor.execute("DELETE FROM scheduler "
-                       "WHERE user_id = ? ",
-                       (telegram_id,))
-        conn.commit()
+    def schedule_task_for_user(self, telegram_id: int, interval_minutes: int):
+        self.schedule_task_for_interval(interval_minutes)
 
-    async def _send_statistics_to_user(self, telegram_id: int):
-        stats = self._get_user_stats(telegram_id)
-        if stats:
-            correct_answers, incorrect_answers = stats
-            message = (
-                f"Статистика использования бота:\n"
-                f"Корректные запросы: {correct_answers}\n"
-                f"Некорректные запросы: {incorrect_answers}"
-            )
-        else:
-            message = "Пока нет данных о вашей статистике."
-        await self.bot.send_message(chat_id=telegram_id, text=message)
+    async def cancel_task_for_user(self, telegram_id: int) -> bool:
+        return await self.repository.delete_interval(telegram_id)
 
-    def _get_user_stats(self, telegram_id: int) -> Tuple[int, int]:
-        conn = self.db_connector.get_connection()
-        cursor = conn.cursor()
-        cursor.execute(
-            "SELECT correct_num, incorrect_num FROM stats WHERE user_id = ?",
-            (telegram_id,),
-        )
-        return cursor.fetchone()
+    async def _send_statistics_for_interval(self, interval_minutes: int):
+        if not LeaderElection().is_leader:
+            return
+        started_at = time.perf_counter()
+        users_stats = await StatsAccumulator().get_stats_for_interval(interval_minutes)
+        if not users_stats:
+            return
+        now = datetime.now(timezone.utc)
+        since_week = format_timestamp(now - timedelta(weeks=1))
+        window_stats = {row[0]: row[1:] for row in await self.repository.get_window_stats_for_interval(
+            interval_minutes, format_timestamp(now - timedelta(hours=1)), format_timestamp(now - timedelta(days=1)),
+            since_week)}
+        frequent_errors: Dict[int, List[Tuple[str, int]]] = {}
+        for telegram_id, error, errors_num in await self.repository.get_frequent_errors_for_interval(
+                interval_minutes, since_week, FREQUENT_ERRORS_NUM):
+            frequent_errors.setdefault(telegram_id, []).append((error, errors_num))
+        spread = min(self.dispatch_spread, interval_minutes * 60 / 2)
+        step = spread / len(users_stats)
+        sends = [
+            self._send_statistics_to_user(telegram_id,
+                                          self._format_statistics((correct_num, incorrect_num),
+                                                                  window_stats.get(telegram_id),
+                                                                  frequent_errors.get(telegram_id, [])),
+                                          delay=index * step + random.uniform(0, step))
+            for index, (telegram_id, correct_num, incorrect_num) in enumerate(users_stats)
+        ]
+        results = await asyncio.gather(*sends, return_exceptions=True)
+        STATS_TICK_LATENCY.observe(time.perf_counter() - started_at, str(interval_minutes))
+        failures = [result for result in results if isinstance(result, Exception)]
+        if failures:
+            print(f"Не удалось отправить статистику {len(failures)} пользователям: {failures[0]}")
+
+    @staticmethod
+    def _format_statistics(stats: Tuple[Optional[int], Optional[int]], window_stats: Optional[tuple],
+                           frequent_errors: List[Tuple[str, int]]) -> str:
+        correct_answers, incorrect_answers = stats
+        if correct_answers is None:
+            return "Пока нет данных о вашей статистике."
+        lines = [
+            "Статистика использования бота:",
+            f"Корректные запросы: {correct_answers}",
+            f"Некорректные запросы: {incorrect_answers}",
+        ]
+        if window_stats is None:
+            return "\n".join(lines + ["За последнюю неделю запросов не было."])
+        lines.append("")
+        for title, position in (("За последний час", 0), ("За сутки", 2), ("За неделю", 4)):
+            lines.append(f"{title}: проверено {window_stats[position]}, с ошибками {window_stats[position + 1]}")
+        if window_stats[5]:
+            breakdown = ", ".join(f"{name} - {window_stats[position]}" for name, position in ERROR_KIND_NAMES
+                                  if window_stats[position])
+            lines.append(f"Типы ошибок за неделю: {breakdown}")
+        if frequent_errors:
+            lines.append("Частые ошибки за неделю:")
+            lines.extend(f"{index}. {error} ({errors_num})"
+                         for index, (error, errors_num) in enumerate(frequent_errors, start=1))
+        return "\n".join(lines)
+
+    async def _send_statistics_to_user(self, telegram_id: int, message: str, delay: float = 0):
+        await asyncio.sleep(delay)
+        outbound_priority.set(PRIORITY_BULK)
+        started_at = time.perf_counter()
+        try:
+            await self.bot.send_message(chat_id=telegram_id, text=message)
+        except Exception:
+            STATS_SEND_LATENCY.observe(time.perf_counter() - started_at, "error")
+            raise
+        STATS_SEND_LATENCY.observe(time.perf_counter() - started_at, "ok")
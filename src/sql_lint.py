@@ -0,0 +1,221 @@
+import re
+from typing import Optional, List, Tuple, NamedTuple
+
+TOKEN_PATTERN = re.compile(r"""
+    (?P<comment>--[^\n]*|/\*.*?(?:\*/|$))
+  | (?P<string>'(?:[^']|'')*')
+  | (?P<unterminated_string>'(?:[^']|'')*$)
+  | (?P<quoted>"(?:[^"]|"")*"|`[^`]*`|\[[^\]]*\])
+  | (?P<unterminated_quoted>"(?:[^"]|"")*$|`[^`]*$)
+  | (?P<number>\d+(?:\.\d+)?(?:[eE][+-]?\d+)?)
+  | (?P<word>[A-Za-z_][A-Za-z0-9_$]*)
+  | (?P<operator><=|>=|<>|!=|==|\|\||[(),;.*+\-/%<>=])
+  | (?P<space>\s+)
+  | (?P<other>.)
+""", re.VERBOSE | re.DOTALL)
+NEAR_TOKEN_PATTERN = re.compile(r'near "(.+?)": syntax error')
+
+KEYWORDS = (
+    "SELECT", "FROM", "WHERE", "GROUP", "ORDER", "BY", "HAVING", "LIMIT", "OFFSET", "DISTINCT", "UNION",
+    "INSERT", "INTO", "VALUES", "UPDATE", "SET", "DELETE", "CREATE", "TABLE", "DROP", "ALTER", "INDEX",
+    "JOIN", "LEFT", "RIGHT", "INNER", "OUTER", "CROSS", "ON", "USING", "AND", "OR", "NOT", "NULL", "AS",
+    "IN", "LIKE", "BETWEEN", "IS", "EXISTS", "CASE", "WHEN", "THEN", "ELSE", "END", "PRIMARY", "KEY",
+    "FOREIGN", "REFERENCES", "DEFAULT", "UNIQUE", "VIEW", "WITH", "ASC", "DESC", "ALL", "EXCEPT", "INTERSECT",
+)
+STATEMENT_KEYWORDS = ("SELECT", "INSERT", "UPDATE", "DELETE", "CREATE", "DROP", "ALTER", "WITH", "REPLACE",
+                      "EXPLAIN", "PRAGMA", "BEGIN", "COMMIT", "ROLLBACK", "VACUUM", "ANALYZE")
+CLAUSE_KEYWORDS = {"FROM", "WHERE", "GROUP", "ORDER", "HAVING", "LIMIT", "UNION", "EXCEPT", "INTERSECT"}
+VALUE_KINDS = ("word", "number", "string", "quoted")
+
+RULE_UNTERMINATED_QUOTE = "unterminated_quote"
+RULE_UNBALANCED_PARENTHESES = "unbalanced_parentheses"
+RULE_TRAILING_COMMA = "trailing_comma"
+RULE_KEYWORD_TYPO = "keyword_typo"
+RULE_MISSING_COMMA = "missing_comma"
+RULE_MISSING_BY = "missing_by"
+RULE_DESCRIPTIONS = {
+    RULE_UNTERMINATED_QUOTE: "Незакрытая кавычка",
+    RULE_UNBALANCED_PARENTHESES: "Несбалансированные скобки",
+    RULE_TRAILING_COMMA: "Лишняя запятая в конце списка",
+    RULE_KEYWORD_TYPO: "Опечатка в ключевом слове",
+    RULE_MISSING_BY: "Пропущено BY после ORDER/GROUP",
+    RULE_MISSING_COMMA: "Пропущенная запятая",
+}
+
+
+class Token(NamedTuple):
+    kind: str
+    value: str
+    position: int
+
+    @property
+    def upper(self) -> str:
+        return self.value.upper()
+
+    @property
+    def is_keyword(self) -> bool:
+        return self.kind == "word" and self.upper in KEYWORDS
+
+    @property
+    def is_value(self) -> bool:
+        return (self.kind in VALUE_KINDS and not self.is_keyword) or self.value == ")"
+
+
+class LintResult(NamedTuple):
+    rule: str
+    explanation: str
+
+
+def tokenize_sql(query: str) -> List[Token]:
+    tokens = []
+    for match in TOKEN_PATTERN.finditer(query):
+        kind = match.lastgroup
+        if kind in ("space", "comment"):
+            continue
+        tokens.append(Token(kind, match.group(), match.start()))
+    return tokens
+
+
+def edit_distance(first: str, second: str) -> int:
+    previous_row = None
+    row = list(range(len(second) + 1))
+    for i in range(1, len(first) + 1):
+        before_previous_row, previous_row = previous_row, row
+        row = [i] + [0] * len(second)
+        for j in range(1, len(second) + 1):
+            cost = 0 if first[i - 1] == second[j - 1] else 1
+            row[j] = min(previous_row[j] + 1, row[j - 1] + 1, previous_row[j - 1] + cost)
+            if i > 1 and j > 1 and first[i - 1] == second[j - 2] and first[i - 2] == second[j - 1]:
+                row[j] = min(row[j], before_previous_row[j - 2] + 1)
+    return row[-1]
+
+
+def find_similar_keyword(word: str, candidates: Tuple[str, ...]) -> Optional[str]:
+    word = word.upper()
+    if len(word) < 3 or word in KEYWORDS or word in candidates:
+        return None
+    for split_position in range(2, len(word) - 1):
+        left, right = word[:split_position], word[split_position:]
+        if left in KEYWORDS and right in KEYWORDS:
+            return f"{left} {right}"
+    max_distance = 1 if len(word) <= 4 else 2
+    best_keyword, best_distance = None, max_distance + 1
+    for keyword in candidates:
+        distance = edit_distance(word, keyword)
+        if distance < best_distance:
+            best_keyword, best_distance = keyword, distance
+    return best_keyword
+
+
+def _replace(query: str, position: int, length: int, replacement: str) -> str:
+    return query[:position] + replacement + query[position + length:]
+
+
+def _with_fix(explanation: str, fixed_query: Optional[str] = None) -> str:
+    if fixed_query is None:
+        return explanation
+    return f"{explanation}\n\nИсправленный запрос:\n{fixed_query}"
+
+
+def _check_quotes(tokens: List[Token]) -> Optional[LintResult]:
+    for token in tokens:
+        if token.kind in ("unterminated_string", "unterminated_quoted"):
+            quote = token.value[0]
+            return LintResult(RULE_UNTERMINATED_QUOTE,
+                              f"Не закрыта кавычка {quote}, открытая в позиции {token.position + 1}: "
+                              f"{token.value[:30]}... Добавьте закрывающую кавычку {quote} в конце значения.")
+    return None
+
+
+def _check_parentheses(tokens: List[Token]) -> Optional[LintResult]:
+    opened = []
+    for token in tokens:
+        if token.value == "(":
+            opened.append(token)
+        elif token.value == ")":
+            if not opened:
+                return LintResult(RULE_UNBALANCED_PARENTHESES,
+                                  f"Лишняя закрывающая скобка в позиции {token.position + 1}: "
+                                  f"для неё нет открывающей скобки.")
+            opened.pop()
+    if opened:
+        return LintResult(RULE_UNBALANCED_PARENTHESES,
+                          f"Не закрыта скобка, открытая в позиции {opened[-1].position + 1}. "
+                          f"Не хватает закрывающих скобок: {len(opened)}.")
+    return None
+
+
+def _check_trailing_comma(query: str, tokens: List[Token]) -> Optional[LintResult]:
+    for token, next_token in zip(tokens, tokens[1:]):
+        if token.value == "," and (next_token.upper in CLAUSE_KEYWORDS or next_token.value in (")", ";")):
+            fixed_query = _replace(query, token.position, 1, "")
+            return LintResult(RULE_TRAILING_COMMA,
+                              _with_fix(f"Лишняя запятая перед «{next_token.value}» в позиции "
+                                        f"{token.position + 1}: после последнего элемента списка запятая "
+                                        f"не ставится.", fixed_query))
+    return None
+
+
+def _check_keyword_typo(query: str, tokens: List[Token], near_token: Optional[str]) -> Optional[LintResult]:
+    candidates = []
+    if tokens and tokens[0].kind == "word":
+        candidates.append((tokens[0], STATEMENT_KEYWORDS))
+    if near_token is not None:
+        for index, token in enumerate(tokens):
+            if token.value != near_token:
+                continue
+            if token.kind == "word":
+                candidates.append((token, KEYWORDS))
+            if index > 0 and tokens[index - 1].kind == "word":
+                candidates.append((tokens[index - 1], KEYWORDS))
+    for token, keywords in candidates:
+        keyword = find_similar_keyword(token.value, keywords)
+        if keyword is not None:
+            fixed_query = _replace(query, token.position, len(token.value), keyword)
+            return LintResult(RULE_KEYWORD_TYPO,
+                              _with_fix(f"Опечатка в ключевом слове: «{token.value}» вместо «{keyword}».",
+                                        fixed_query))
+    return None
+
+
+def _check_missing_by(query: str, tokens: List[Token]) -> Optional[LintResult]:
+    for token, next_token in zip(tokens, tokens[1:]):
+        if token.upper in ("ORDER", "GROUP") and next_token.upper != "BY":
+            fixed_query = _replace(query, token.position + len(token.value), 0, " BY")
+            return LintResult(RULE_MISSING_BY,
+                              _with_fix(f"После «{token.value}» пропущено ключевое слово BY: "
+                                        f"используйте «{token.upper} BY».", fixed_query))
+    return None
+
+
+def _check_missing_comma(query: str, tokens: List[Token], near_token: Optional[str]) -> Optional[LintResult]:
+    if near_token is None:
+        return None
+    for index, token in enumerate(tokens):
+        if token.value != near_token or index == 0 or not token.is_value or token.value == ")":
+            continue
+        previous = tokens[index - 1]
+        if not previous.is_value:
+            continue
+        literal_pair = token.kind in ("number", "string") or previous.kind in ("number", "string")
+        before_previous = tokens[index - 2] if index > 1 else None
+        identifier_triple = before_previous is not None and before_previous.is_value
+        if not literal_pair and not identifier_triple:
+            continue
+        fixed_query = _replace(query, previous.position + len(previous.value), 0, ",")
+        return LintResult(RULE_MISSING_COMMA,
+                          _with_fix(f"Пропущена запятая между «{previous.value}» и «{token.value}»: "
+                                    f"элементы списка разделяются запятыми.", fixed_query))
+    return None
+
+
+def lint_sql(query: str, error_message: str) -> Optional[LintResult]:
+    tokens = tokenize_sql(query)
+    near_match = NEAR_TOKEN_PATTERN.search(error_message)
+    near_token = near_match.group(1) if near_match else None
+    return (_check_quotes(tokens)
+            or _check_parentheses(tokens)
+            or _check_trailing_comma(query, tokens)
+            or _check_keyword_typo(query, tokens, near_token)
+            or _check_missing_by(query, tokens)
+            or _check_missing_comma(query, tokens, near_token))
@@ -0,0 +1,46 @@
+import hashlib
+import re
+import sqlite3
+from typing import List
+
+STRING_LITERAL_PATTERN = re.compile(r"'(?:[^']|'')*'")
+NUMERIC_LITERAL_PATTERN = re.compile(r"\b\d+(?:\.\d+)?\b")
+WHITESPACE_PATTERN = re.compile(r"\s+")
+STATEMENT_END_PATTERN = re.compile(r"(?<=;)")
+COMMENT_PATTERN = re.compile(r"--[^\n]*|/\*.*?(?:\*/|$)", re.DOTALL)
+LEADING_COMMENTS_PATTERN = re.compile(rf"^(?:\s|{COMMENT_PATTERN.pattern})*", re.DOTALL)
+
+
+def normalize_sql(query: str) -> str:
+    normalized = STRING_LITERAL_PATTERN.sub("?", query)
+    normalized = NUMERIC_LITERAL_PATTERN.sub("?", normalized)
+    normalized = WHITESPACE_PATTERN.sub(" ", normalized)
+    return normalized.strip().rstrip(";").strip().lower()
+
+
+def make_query_key(query: str, error_message: str) -> str:
+    normalized_error = WHITESPACE_PATTERN.sub(" ", error_message).strip().lower()
+    payload = f"{normalize_sql(query)}\n{normalized_error}"
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def has_sql_code(text: str) -> bool:
+    return bool(COMMENT_PATTERN.sub("", text).replace(";", "").strip())
+
+
+def strip_leading_comments(statement: str) -> str:
+    return LEADING_COMMENTS_PATTERN.sub("", statement, count=1)
+
+
+def split_sql_statements(script: str) -> List[str]:
+    statements = []
+    current = ""
+    for piece in STATEMENT_END_PATTERN.split(script):
+        current += piece
+        if sqlite3.complete_statement(current):
+            if has_sql_code(current):
+                statements.append(current.strip())
+            current = ""
+    if has_sql_code(current):
+        statements.append(current.strip())
+    return statements
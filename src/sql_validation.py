@@ -0,0 +1,210 @@
+import asyncio
+import os
+import queue
+import re
+import sqlite3
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional, List, Dict, NamedTuple
+
+from src.configs_management import ConfigsManager
+from src.sql_utils import WHITESPACE_PATTERN, strip_leading_comments
+
+ERROR_SYNTAX = "syntax"
+ERROR_UNKNOWN_OBJECT = "unknown_object"
+ERROR_SEMANTIC = "semantic"
+
+SCHEMA_STATEMENT_PREFIXES = ("create", "drop", "alter")
+SYNTAX_ERROR_MARKERS = ("syntax error", "unrecognized token", "incomplete input")
+UNKNOWN_OBJECT_MARKERS = ("no such table", "no such column", "no such function", "no such index",
+                          "no such collation", "no such module", "unknown database")
+CREATE_AS_SELECT_PATTERN = re.compile(r"^\s*create\s+(?:temp\s+|temporary\s+)?table\s+(?:if\s+not\s+exists\s+)?"
+                                      r"\S+\s+as\b", re.IGNORECASE)
+PROGRESS_HANDLER_PERIOD = 1000
+CONNECTION_LIMITS = (
+    (sqlite3.SQLITE_LIMIT_LENGTH, 1_000_000),
+    (sqlite3.SQLITE_LIMIT_SQL_LENGTH, 256 * 1024),
+    (sqlite3.SQLITE_LIMIT_COLUMN, 200),
+    (sqlite3.SQLITE_LIMIT_EXPR_DEPTH, 100),
+    (sqlite3.SQLITE_LIMIT_COMPOUND_SELECT, 50),
+    (sqlite3.SQLITE_LIMIT_ATTACHED, 0),
+    (sqlite3.SQLITE_LIMIT_TRIGGER_DEPTH, 10),
+)
+
+
+class InstructionLimitExceeded(sqlite3.OperationalError):
+    pass
+
+
+class ValidationResult(NamedTuple):
+    error_kind: Optional[str] = None
+    error: Optional[Exception] = None
+
+    @property
+    def is_valid(self) -> bool:
+        return self.error is None
+
+
+class SQLValidator:
+    _instance = None
+
+    def __new__(cls):
+        if cls._instance is None:
+            cls._instance = super().__new__(cls)
+            cls._instance.__init__()
+            cls._instance._initialize_pool()
+        return cls._instance
+
+    def __init__(self):
+        configs_manager = ConfigsManager()
+        self.schemas_dir = configs_manager.practice_schemas_dir
+        self.pool_size = configs_manager.validation_pool_size
+        self.cache_size = configs_manager.validation_cache_size
+        self.instruction_limit = configs_manager.validation_instruction_limit
+
+    def _initialize_pool(self):
+        self.schema_scripts = self._load_schema_scripts()
+        self._connections: queue.Queue = queue.Queue()
+        for _ in range(self.pool_size):
+            self._connections.put(self._create_connection())
+        self._executor = ThreadPoolExecutor(max_workers=self.pool_size, thread_name_prefix="sql-validator")
+        self._results: OrderedDict = OrderedDict()
+        self.cache_hits = 0
+        self.cache_misses = 0
+
+    @property
+    def has_schemas(self) -> bool:
+        return bool(self.schema_scripts)
+
+    def _load_schema_scripts(self) -> List[str]:
+        if not self.schemas_dir:
+            return []
+        if not os.path.exists(self.schemas_dir):
+            raise FileNotFoundError(f"Директория учебных схем '{self.schemas_dir}' не найдена.")
+        scripts = []
+        for filename in sorted(os.listdir(self.schemas_dir)):
+            with open(os.path.join(self.schemas_dir, filename), "r", encoding="utf-8") as file:
+                scripts.append(file.read())
+        return scripts
+
+    def _create_connection(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(":memory:", check_same_thread=False, isolation_level=None,
+                               cached_statements=self.cache_size)
+        for script in self.schema_scripts:
+            conn.executescript(script)
+        for category, limit in CONNECTION_LIMITS:
+            conn.setlimit(category, limit)
+        return conn
+
+    def _execute_limited(self, conn: sqlite3.Connection, statement: str):
+        budget = max(self.instruction_limit // PROGRESS_HANDLER_PERIOD, 1)
+
+        def check_budget() -> bool:
+            nonlocal budget
+            budget -= 1
+            return budget < 0
+
+        conn.set_progress_handler(check_budget, PROGRESS_HANDLER_PERIOD)
+        try:
+            conn.execute(statement)
+        except sqlite3.OperationalError as e:
+            if budget < 0:
+                raise InstructionLimitExceeded("Превышен лимит времени проверки запроса.") from e
+            raise
+        finally:
+            conn.set_progress_handler(None, 0)
+
+    def get_metrics(self) -> Dict[str, float]:
+        return {
+            "idle_connections": self._connections.qsize(),
+            "cache_size": len(self._results),
+            "cache_hits": self.cache_hits,
+            "cache_misses": self.cache_misses,
+            "hit_ratio": self.cache_hits / max(self.cache_hits + self.cache_misses, 1),
+        }
+
+    @staticmethod
+    def classify_error(error: Exception) -> str:
+        message = str(error).lower()
+        if any(marker in message for marker in SYNTAX_ERROR_MARKERS):
+            return ERROR_SYNTAX
+        if any(marker in message for marker in UNKNOWN_OBJECT_MARKERS):
+            return ERROR_UNKNOWN_OBJECT
+        return ERROR_SEMANTIC
+
+    def counts_as_error(self, result: ValidationResult) -> bool:
+        if result.is_valid:
+            return False
+        return result.error_kind != ERROR_UNKNOWN_OBJECT or self.has_schemas
+
+    def _validate_sync(self, sql_query: str) -> ValidationResult:
+        conn = self._connections.get()
+        try:
+            self._execute_limited(conn, f"EXPLAIN {sql_query}")
+            return ValidationResult()
+        except (sqlite3.Error, sqlite3.Warning) as e:
+            return ValidationResult(self.classify_error(e), e)
+        finally:
+            self._connections.put(conn)
+
+    def _validate_batch_sync(self, statements: List[str]) -> List[ValidationResult]:
+        conn = self._connections.get()
+        results = []
+        reset_connection = False
+        try:
+            conn.execute("SAVEPOINT batch_validation")
+            for statement in statements:
+                try:
+                    if reset_connection:
+                        raise InstructionLimitExceeded("Проверка пропущена: предыдущий запрос превысил лимит.")
+                    code = strip_leading_comments(statement)
+                    create_as_select = CREATE_AS_SELECT_PATTERN.match(code)
+                    if create_as_select:
+                        self._execute_limited(conn, f"EXPLAIN {statement}")
+                        select = code[create_as_select.end():].strip().rstrip(";")
+                        self._execute_limited(conn, f"{create_as_select.group()} SELECT * FROM ({select}) LIMIT 0")
+                    elif code.lower().startswith(SCHEMA_STATEMENT_PREFIXES):
+                        self._execute_limited(conn, statement)
+                    else:
+                        self._execute_limited(conn, f"EXPLAIN {statement}")
+                    results.append(ValidationResult())
+                except InstructionLimitExceeded as e:
+                    reset_connection = True
+                    results.append(ValidationResult(ERROR_SEMANTIC, e))
+                except (sqlite3.Error, sqlite3.Warning) as e:
+                    results.append(ValidationResult(self.classify_error(e), e))
+            if not reset_connection:
+                conn.execute("ROLLBACK TO batch_validation")
+                conn.execute("RELEASE batch_validation")
+        except sqlite3.Error:
+            reset_connection = True
+            raise
+        finally:
+            if reset_connection:
+                conn.close()
+                conn = self._create_connection()
+            self._connections.put(conn)
+        return results
+
+    def _remember(self, key: str, result: ValidationResult):
+        self._results[key] = result
+        self._results.move_to_end(key)
+        while len(self._results) > self.cache_size:
+            self._results.popitem(last=False)
+
+    async def validate(self, sql_query: str) -> ValidationResult:
+        key = WHITESPACE_PATTERN.sub(" ", sql_query).strip()
+        result = self._results.get(key)
+        if result is not None:
+            self._results.move_to_end(key)
+            self.cache_hits += 1
+            return result
+        self.cache_misses += 1
+        loop = asyncio.get_running_loop()
+        result = await loop.run_in_executor(self._executor, self._validate_sync, sql_query)
+        self._remember(key, result)
+        return result
+
+    async def validate_batch(self, statements: List[str]) -> List[ValidationResult]:
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, self._validate_batch_sync, statements)
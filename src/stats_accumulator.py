@@ -0,0 +1,89 @@
+import asyncio
+import sqlite3
+from typing import Optional, List, Dict, Tuple
+
+from src.configs_management import ConfigsManager
+from src.db_repository import DBRepository
+
+
+class StatsAccumulator:
+    _instance = None
+
+    def __new__(cls):
+        if cls._instance is None:
+            cls._instance = super().__new__(cls)
+            cls._instance.__init__()
+            cls._instance._initialize_counters()
+        return cls._instance
+
+    def __init__(self):
+        self.flush_interval = ConfigsManager().stats_flush_interval
+        self.repository = DBRepository()
+
+    def _initialize_counters(self):
+        self._pending: Dict[int, List[int]] = {}
+        self._flush_lock = asyncio.Lock()
+        self._flush_task: Optional[asyncio.Task] = None
+        self._stop_event = asyncio.Event()
+        self.flushed_users = 0
+        self.failed_flushes = 0
+
+    def get_metrics(self) -> Dict[str, int]:
+        return {
+            "pending_users": len(self._pending),
+            "flushed_users": self.flushed_users,
+            "failed_flushes": self.failed_flushes,
+        }
+
+    def add(self, telegram_id: int, correct: int = 0, incorrect: int = 0):
+        counters = self._pending.setdefault(telegram_id, [0, 0])
+        counters[0] += correct
+        counters[1] += incorrect
+
+    def _merge(self, telegram_id: int, correct_num: Optional[int],
+               incorrect_num: Optional[int]) -> Tuple[Optional[int], Optional[int]]:
+        counters = self._pending.get(telegram_id)
+        if correct_num is None or counters is None:
+            return correct_num, incorrect_num
+        return correct_num + counters[0], incorrect_num + counters[1]
+
+    async def get_stats_for_interval(self, interval_minutes: int) -> List[Tuple[int, int, int]]:
+        async with self._flush_lock:
+            users_stats = await self.repository.get_stats_for_interval(interval_minutes)
+            return [(telegram_id, *self._merge(telegram_id, correct_num, incorrect_num))
+                    for telegram_id, correct_num, incorrect_num in users_stats]
+
+    async def flush(self):
+        async with self._flush_lock:
+            if not self._pending:
+                return
+            flushing, self._pending = self._pending, {}
+            increments = [(correct, incorrect, telegram_id) for telegram_id, (correct, incorrect) in flushing.items()]
+            try:
+                await asyncio.shield(self.repository.increment_stats(increments))
+                self.flushed_users += len(increments)
+            except sqlite3.Error as e:
+                self.failed_flushes += 1
+                for telegram_id, (correct, incorrect) in flushing.items():
+                    self.add(telegram_id, correct, incorrect)
+                print(f"Ошибка записи статистики: {e}")
+
+    async def _flush_loop(self):
+        while not self._stop_event.is_set():
+            try:
+                await asyncio.wait_for(self._stop_event.wait(), timeout=self.flush_interval)
+            except asyncio.TimeoutError:
+                pass
+            await self.flush()
+
+    async def start(self):
+        if self._flush_task is None:
+            self._stop_event.clear()
+            self._flush_task = asyncio.create_task(self._flush_loop())
+
+    async def stop(self):
+        if self._flush_task is not None:
+            self._stop_event.set()
+            await self._flush_task
+            self._flush_task = None
+        await self.flush()
@@ -0,0 +1,79 @@
+import time
+from typing import Optional, List, AsyncIterator
+
+from aiogram.exceptions import TelegramBadRequest
+from aiogram.types import Message
+
+from src.configs_management import ConfigsManager
+
+TELEGRAM_MESSAGE_LIMIT = 4096
+MESSAGE_NOT_MODIFIED = "message is not modified"
+
+
+def find_split_position(text: str) -> int:
+    split_at = text.rfind("\n", 0, TELEGRAM_MESSAGE_LIMIT)
+    if split_at < TELEGRAM_MESSAGE_LIMIT // 2:
+        split_at = text.rfind(" ", 0, TELEGRAM_MESSAGE_LIMIT)
+    if split_at < TELEGRAM_MESSAGE_LIMIT // 2:
+        split_at = TELEGRAM_MESSAGE_LIMIT
+    return split_at
+
+
+def split_long_text(text: str) -> List[str]:
+    parts = []
+    while len(text) > TELEGRAM_MESSAGE_LIMIT:
+        split_at = find_split_position(text)
+        parts.append(text[:split_at])
+        text = text[split_at:].lstrip()
+    parts.append(text)
+    return parts
+
+
+class StreamingReply:
+    def __init__(self, message: Message, prefix: str = ""):
+        configs_manager = ConfigsManager()
+        self.message = message
+        self.edit_interval = configs_manager.stream_edit_interval
+        self._text = prefix
+        self._rendered = ""
+        self._sent: Optional[Message] = None
+        self._last_render = 0.0
+
+    async def _render(self, text: str):
+        text = text.strip()
+        if not text or text == self._rendered:
+            return
+        if self._sent is None:
+            self._sent = await self.message.answer(text)
+        else:
+            try:
+                await self._sent.edit_text(text)
+            except TelegramBadRequest as e:
+                if MESSAGE_NOT_MODIFIED not in e.message:
+                    raise
+        self._rendered = text
+        self._last_render = time.monotonic()
+
+    async def feed(self, chunk: str):
+        self._text += chunk
+        while len(self._text) > TELEGRAM_MESSAGE_LIMIT:
+            split_at = find_split_position(self._text)
+            head, self._text = self._text[:split_at], self._text[split_at:].lstrip()
+            await self._render(head)
+            self._sent = None
+            self._rendered = ""
+        if time.monotonic() - self._last_render >= self.edit_interval:
+            await self._render(self._text)
+
+    async def finish(self):
+        await self._render(self._text)
+
+
+async def answer_streaming(message: Message, chunks: AsyncIterator[str], prefix: str = "") -> str:
+    reply = StreamingReply(message, prefix)
+    parts = []
+    async for chunk in chunks:
+        parts.append(chunk)
+        await reply.feed(chunk)
+    await reply.finish()
+    return "".join(parts)
@@ -0,0 +1,77 @@
+import time
+from collections import OrderedDict
+from typing import Dict
+
+from src.configs_management import ConfigsManager
+from src.db_repository import DBRepository
+
+
+class UserCache:
+    _instance = None
+
+    def __new__(cls):
+        if cls._instance is None:
+            cls._instance = super().__new__(cls)
+            cls._instance.__init__()
+            cls._instance._initialize_cache()
+        return cls._instance
+
+    def __init__(self):
+        configs_manager = ConfigsManager()
+        self.max_size = configs_manager.user_cache_size
+        self.negative_ttl = configs_manager.user_cache_negative_ttl
+        self.repository = DBRepository()
+
+    def _initialize_cache(self):
+        self._registered: OrderedDict = OrderedDict()
+        self._unregistered: OrderedDict = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def get_metrics(self) -> Dict[str, float]:
+        return {
+            "size": len(self._registered),
+            "negative_size": len(self._unregistered),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": self.hits / max(self.hits + self.misses, 1),
+        }
+
+    @staticmethod
+    def _put(entries: OrderedDict, telegram_id: int, value, max_size: int):
+        entries[telegram_id] = value
+        entries.move_to_end(telegram_id)
+        while len(entries) > max_size:
+            entries.popitem(last=False)
+
+    def _lookup(self, telegram_id: int):
+        if telegram_id in self._registered:
+            self._registered.move_to_end(telegram_id)
+            return True
+        expires_at = self._unregistered.get(telegram_id)
+        if expires_at is not None:
+            if expires_at > time.monotonic():
+                return False
+            del self._unregistered[telegram_id]
+        return None
+
+    async def is_registered(self, telegram_id: int) -> bool:
+        cached = self._lookup(telegram_id)
+        if cached is not None:
+            self.hits += 1
+            return cached
+        self.misses += 1
+        user = await self.repository.get_user(telegram_id)
+        if user:
+            self.mark_registered(telegram_id)
+        elif self.negative_ttl > 0:
+            self._put(self._unregistered, telegram_id, time.monotonic() + self.negative_ttl, self.max_size)
+        return user is not None
+
+    def mark_registered(self, telegram_id: int):
+        self._unregistered.pop(telegram_id, None)
+        self._put(self._registered, telegram_id, True, self.max_size)
+
+    def invalidate(self, telegram_id: int):
+        self._registered.pop(telegram_id, None)
+        self._unregistered.pop(telegram_id, None)
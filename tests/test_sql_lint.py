@@ -0,0 +1,81 @@
+import sqlite3
+
+import pytest
+
+from src.sql_lint import (lint_sql, edit_distance, find_similar_keyword, tokenize_sql, KEYWORDS, STATEMENT_KEYWORDS,
+                          RULE_UNTERMINATED_QUOTE, RULE_UNBALANCED_PARENTHESES, RULE_TRAILING_COMMA,
+                          RULE_KEYWORD_TYPO, RULE_MISSING_BY, RULE_MISSING_COMMA)
+
+
+def sqlite_error(query: str) -> str:
+    conn = sqlite3.connect(":memory:")
+    conn.execute("CREATE TABLE t (a, b, c)")
+    try:
+        conn.execute(f"EXPLAIN {query}")
+    except sqlite3.Error as e:
+        return str(e)
+    finally:
+        conn.close()
+    pytest.fail(f"Запрос должен завершаться ошибкой: {query}")
+
+
+def test_tokenize_sql_skips_comments_and_keeps_literals():
+    tokens = tokenize_sql("SELECT 'a -- b' -- comment\nFROM t")
+    assert [token.value for token in tokens] == ["SELECT", "'a -- b'", "FROM", "t"]
+
+
+@pytest.mark.parametrize("first, second, distance", [
+    ("SELECT", "SELECT", 0),
+    ("SELEC", "SELECT", 1),
+    ("SLEECT", "SELECT", 1),
+    ("FORM", "FROM", 1),
+    ("WHER", "WHERE", 1),
+    ("", "AND", 3),
+])
+def test_edit_distance(first, second, distance):
+    assert edit_distance(first, second) == distance
+
+
+@pytest.mark.parametrize("word, candidates, expected", [
+    ("selec", STATEMENT_KEYWORDS, "SELECT"),
+    ("FORM", KEYWORDS, "FROM"),
+    ("WHER", KEYWORDS, "WHERE"),
+    ("ORDERBY", KEYWORDS, "ORDER BY"),
+    ("FROM", KEYWORDS, None),
+    ("REPLACE", STATEMENT_KEYWORDS, None),
+    ("PRAGMA", STATEMENT_KEYWORDS, None),
+    ("users", KEYWORDS, None),
+    ("AS", KEYWORDS, None),
+])
+def test_find_similar_keyword(word, candidates, expected):
+    assert find_similar_keyword(word, candidates) == expected
+
+
+@pytest.mark.parametrize("query, rule, fixed_query", [
+    ("SELECT 'abc FROM t", RULE_UNTERMINATED_QUOTE, None),
+    ("SELECT (a + 1 FROM t", RULE_UNBALANCED_PARENTHESES, None),
+    ("SELECT a) FROM t", RULE_UNBALANCED_PARENTHESES, None),
+    ("SELECT a, b, FROM t", RULE_TRAILING_COMMA, "SELECT a, b FROM t"),
+    ("SELEC a FROM t", RULE_KEYWORD_TYPO, "SELECT a FROM t"),
+    ("SELECT a FORM t", RULE_KEYWORD_TYPO, "SELECT a FROM t"),
+    ("SELECT a FROM t WHER a = 1", RULE_KEYWORD_TYPO, "SELECT a FROM t WHERE a = 1"),
+    ("SELECT a FROM t ORDER a", RULE_MISSING_BY, "SELECT a FROM t ORDER BY a"),
+    ("SELECT a b c FROM t", RULE_MISSING_COMMA, "SELECT a b, c FROM t"),
+    ("SELECT 1 2 FROM t", RULE_MISSING_COMMA, "SELECT 1, 2 FROM t"),
+])
+def test_lint_sql_rules(query, rule, fixed_query):
+    result = lint_sql(query, sqlite_error(query))
+    assert result is not None
+    assert result.rule == rule
+    if fixed_query is not None:
+        assert result.explanation.endswith(f"Исправленный запрос:\n{fixed_query}")
+
+
+@pytest.mark.parametrize("query", [
+    "REPLACE INTO t VALUES (1,,2)",
+    "EXPLAIN SELECT a FROM t WHERE",
+    "SELECT a FROM t WHERE a = = 1",
+    "SELECT missing FROM t",
+])
+def test_lint_sql_leaves_other_errors_to_analysis(query):
+    assert lint_sql(query, sqlite_error(query)) is None